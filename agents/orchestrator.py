@@ -1,25 +1,43 @@
 #!/usr/bin/env python3
 import json
-import time
+import asyncio
 import argparse
 from pathlib import Path
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 def load_agents(path: Path):
-    with open(path, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def run_agent(agent, simulate=True, delay=1.0):
-    print(f"\n=== Scheduling Agent {agent['id']} - {agent['name']} ===")
-    print(f"Role: {agent['role']}\n")
-    print("Prompt:\n")
-    print(agent['prompt'])
+    with open(path, 'rb') as f:
+        return _loads(f.read())
+
+async def run_agent(agent, simulate=True, delay=1.0):
+    # Print each block in one call so concurrent agents don't interleave lines
+    print(
+        f"\n=== Scheduling Agent {agent['id']} - {agent['name']} ===\n"
+        f"Role: {agent['role']}\n\n"
+        "Prompt:\n\n"
+        f"{agent['prompt']}"
+    )
     if simulate:
-        print('\n[SIMULATION] Waiting for simulated LLM output...')
-        time.sleep(delay)
+        print(f"\n[SIMULATION] Agent {agent['id']} waiting for simulated LLM output...")
+        await asyncio.sleep(delay)
         print(f"[SIMULATION] Agent {agent['id']} completed with simulated output.\n")
     else:
         print('\n[INFO] Replace simulation with real LLM call in this script.')
 
+async def run_all(agents, max_concurrent, simulate=True, delay=1.0):
+    sem = asyncio.Semaphore(max_concurrent)
+
+    async def guarded(agent):
+        async with sem:
+            await run_agent(agent, simulate=simulate, delay=delay)
+
+    await asyncio.gather(*(guarded(agent) for agent in agents))
+
 def main():
     parser = argparse.ArgumentParser(description='Simple multi-agent orchestrator (simulation)')
     parser.add_argument('--agents-file', type=str, default='agents_def.json')
@@ -32,8 +50,8 @@ def main():
     cfg = load_agents(agents_path)
     print(f"Loaded {len(cfg.get('agents', []))} agents (max_concurrent={cfg.get('max_concurrent_requests')})")
 
-    for agent in cfg.get('agents', []):
-        run_agent(agent, simulate=args.simulate, delay=args.delay)
+    max_concurrent = max(1, cfg.get('max_concurrent_requests') or 4)
+    asyncio.run(run_all(cfg.get('agents', []), max_concurrent, simulate=args.simulate, delay=args.delay))
 
     print('\nAll agents scheduled.')
 
@@ -0,0 +1,62 @@
+"""
+Numeric kernels for the lane mask hot path in prepare_lane_dataset.
+
+Kept free of project imports and fully annotated so the module can be
+compiled ahead of time with mypyc (run from this directory so the
+extension lands next to the source):
+
+    cd scripts/ml_pipeline && mypyc _lane_kernels.py
+
+The compiled extension is picked up in place of this file when present;
+without it the pure Python version is used.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+LaneLine = Tuple[Tuple[int, int], Tuple[int, int], float]
+
+
+def split_lane_segments(
+    segments: np.ndarray, min_slope: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split line segments into left and right lane candidates by slope.
+
+    Args:
+        segments: Line segments as an (N, 4) array of (x1, y1, x2, y2) rows.
+        min_slope: Minimum absolute slope for a segment to be kept.
+
+    Returns:
+        Tuple of (left, right) segment arrays with negative/positive slope.
+    """
+    dx = segments[:, 2] - segments[:, 0]
+    dy = segments[:, 3] - segments[:, 1]
+    vertical = dx == 0
+    slopes = np.divide(dy, dx, out=np.zeros(len(segments)), where=~vertical)
+    steep = ~vertical & (np.abs(slopes) >= min_slope)
+    return segments[steep & (slopes < 0)], segments[steep & (slopes > 0)]
+
+
+def fit_lane_line(lines: np.ndarray, height: int) -> Optional[LaneLine]:
+    """
+    Fit a single lane line from multiple line segments.
+
+    Args:
+        lines: Line segments as an (N, 4) array of (x1, y1, x2, y2) rows.
+        height: Image height for extrapolation.
+
+    Returns:
+        Tuple of ((x_bottom, y_bottom), (x_top, y_top), angle) or None.
+    """
+    if len(lines) == 0:
+        return None
+    points = np.asarray(lines).reshape(-1, 2)
+    m, b = np.polyfit(points[:, 1], points[:, 0], 1)
+    y_bottom = height
+    y_top = int(height * 0.6)
+    x_bottom = int(m * y_bottom + b)
+    x_top = int(m * y_top + b)
+    angle = float(np.arctan(m))
+    return (x_bottom, y_bottom), (x_top, y_top), angle
@@ -11,14 +11,52 @@ This module provides advanced preprocessing techniques for lane detection includ
 
 from __future__ import annotations
 
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Deque, Dict, Iterable, Iterator, Optional, Tuple
 
 import cv2
 import numpy as np
 
+try:
+    import numba as nb
+except ImportError:
+    nb = None
 
-@dataclass
+# Lane line segments as an (N, 4) int array of (x1, y1, x2, y2) rows.
+Lines = np.ndarray
+
+_GAMMA_LUT_CACHE: Dict[float, np.ndarray] = {}
+_KERNEL_CACHE: Dict[Tuple[int, int], np.ndarray] = {}
+# CLAHE instances and GPU pipelines hold per-call scratch state, so they
+# are cached per thread.
+_THREAD_LOCAL = threading.local()
+
+
+def _thread_cache(name: str) -> dict:
+    """Return a dict cache private to the calling thread."""
+    cache = getattr(_THREAD_LOCAL, name, None)
+    if cache is None:
+        cache = {}
+        setattr(_THREAD_LOCAL, name, cache)
+    return cache
+
+
+def _cuda_available() -> bool:
+    """Return True if OpenCV was built with CUDA and a device is present."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+CUDA_AVAILABLE = _cuda_available()
+
+
+@dataclass(frozen=True)
 class LaneDetectionConfig:
     """Configuration parameters for lane detection."""
     canny_low: int = 50
@@ -26,6 +64,7 @@ class LaneDetectionConfig:
     hough_threshold: int = 50
     hough_min_line_length: int = 50
     hough_max_line_gap: int = 180
+    hough_theta: float = np.pi / 90
     min_slope: float = 0.3
     max_slope: float = 3.0
     brightness_threshold: int = 60
@@ -37,6 +76,12 @@ class LaneDetectionConfig:
     temporal_alpha: float = 0.3
     min_line_points: int = 2
     curve_detection_window: int = 50
+    use_cuda: bool = True
+    processing_scale: float = 0.5
+    min_roi_lines: int = 6
+
+
+_DEFAULT_CONFIG = LaneDetectionConfig()
 
 
 @dataclass
@@ -61,37 +106,43 @@ class TemporalSmoother:
     
     def __init__(self, alpha: float = 0.3):
         self.alpha = alpha
-        self.left_line: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
-        self.right_line: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
+        # Smoothed lines as (2, 2) int32 arrays of [[x_bottom, y_bottom], [x_top, y_top]].
+        self.left_line: Optional[np.ndarray] = None
+        self.right_line: Optional[np.ndarray] = None
         self.prev_mask: Optional[np.ndarray] = None
+        self.mask_buf: Optional[np.ndarray] = None
+        self.poly_buf = np.empty((1, 4, 2), dtype=np.int32)
+    
+    @staticmethod
+    def _zeroed(buf: Optional[np.ndarray], shape: Tuple[int, int]) -> np.ndarray:
+        if buf is None or buf.shape != shape:
+            return np.zeros(shape, dtype=np.uint8)
+        buf.fill(0)
+        return buf
+    
+    def mask_buffer(self, shape: Tuple[int, int]) -> np.ndarray:
+        """Return a zeroed scratch buffer for lane drawing, reused across frames."""
+        self.mask_buf = self._zeroed(self.mask_buf, shape)
+        return self.mask_buf
     
     def smooth_line(
         self,
         line: Optional[Tuple[Tuple[int, int], Tuple[int, int]]],
-        prev_line: Optional[Tuple[Tuple[int, int], Tuple[int, int]]]
-    ) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        prev_line: Optional[np.ndarray]
+    ) -> Optional[np.ndarray]:
         if line is None:
             return prev_line
+        line = np.asarray(line, dtype=np.int32)
         if prev_line is None:
             return line
         
-        smoothed = (
-            (
-                int(self.alpha * line[0][0] + (1 - self.alpha) * prev_line[0][0]),
-                int(self.alpha * line[0][1] + (1 - self.alpha) * prev_line[0][1])
-            ),
-            (
-                int(self.alpha * line[1][0] + (1 - self.alpha) * prev_line[1][0]),
-                int(self.alpha * line[1][1] + (1 - self.alpha) * prev_line[1][1])
-            )
-        )
-        return smoothed
+        return (self.alpha * line + (1 - self.alpha) * prev_line).astype(np.int32, copy=False)
     
     def update(
         self,
         left: Optional[Tuple[Tuple[int, int], Tuple[int, int]]],
         right: Optional[Tuple[Tuple[int, int], Tuple[int, int]]]
-    ) -> Tuple[Optional[Tuple[Tuple[int, int], Tuple[int, int]]], Optional[Tuple[Tuple[int, int], Tuple[int, int]]]]:
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
         self.left_line = self.smooth_line(left, self.left_line)
         self.right_line = self.smooth_line(right, self.right_line)
         return self.left_line, self.right_line
@@ -104,6 +155,7 @@ class TemporalSmoother:
             return mask
         
         blended = cv2.addWeighted(mask, self.alpha, self.prev_mask, 1 - self.alpha, 0)
+        # Keep a private copy; callers may draw on the returned mask.
         self.prev_mask = blended.copy()
         return blended
     
@@ -113,6 +165,163 @@ class TemporalSmoother:
         self.prev_mask = None
 
 
+class GpuPipeline:
+    """
+    Runs blur, Canny and Hough segment detection on a CUDA device.
+    
+    Frames are staged through a page-locked host buffer so uploads can run
+    asynchronously on the pipeline's stream. Each instance owns its own
+    stream and filters; use one instance per in-flight frame.
+    """
+    
+    def __init__(self, config: LaneDetectionConfig):
+        self.stream = cv2.cuda_Stream()
+        self.gpu_gray = cv2.cuda_GpuMat()
+        self.host_gray: Optional[np.ndarray] = None
+        self.segments = None
+        self.shape: Tuple[int, int] = (0, 0)
+        self.gaussian = cv2.cuda.createGaussianFilter(cv2.CV_8UC1, cv2.CV_8UC1, (5, 5), 0)
+        self.canny = cv2.cuda.createCannyEdgeDetector(config.canny_low, config.canny_high)
+        threshold, min_line_length, max_line_gap = _hough_params(config)
+        self.hough = cv2.cuda.createHoughSegmentDetector(
+            1,
+            config.hough_theta,
+            min_line_length,
+            max_line_gap,
+            4096,
+            threshold
+        )
+    
+    def __del__(self):
+        self._release_host()
+    
+    def _release_host(self) -> None:
+        if self.host_gray is not None:
+            cv2.cuda.unregisterPageLocked(self.host_gray)
+            self.host_gray = None
+    
+    def _stage(self, gray: np.ndarray) -> np.ndarray:
+        """Copy a frame into the page-locked upload buffer."""
+        if self.host_gray is None or self.host_gray.shape != gray.shape:
+            self._release_host()
+            self.host_gray = np.empty(gray.shape, dtype=np.uint8)
+            cv2.cuda.registerPageLocked(self.host_gray)
+        np.copyto(self.host_gray, gray)
+        return self.host_gray
+    
+    def submit(self, gray: np.ndarray) -> None:
+        """
+        Queue upload, blur, Canny and Hough for a frame without waiting.
+        
+        A one pixel border is added before Canny to avoid edge artifacts at
+        the frame border. Call collect() before submitting the next frame
+        to this instance.
+        
+        Args:
+            gray: Grayscale input image
+        """
+        self.shape = gray.shape
+        self.gpu_gray.upload(self._stage(gray), self.stream)
+        blur = self.gaussian.apply(self.gpu_gray, stream=self.stream)
+        padded = cv2.cuda.copyMakeBorder(blur, 1, 1, 1, 1, cv2.BORDER_REPLICATE, stream=self.stream)
+        edges = self.canny.detect(padded, stream=self.stream)
+        self.segments = self.hough.detect(edges, stream=self.stream)
+    
+    def collect(self) -> Optional[np.ndarray]:
+        """
+        Wait for the submitted frame and download its segment list.
+        
+        Returns:
+            Lines in cv2.HoughLinesP layout (N, 1, 4), or None
+        """
+        height, width = self.shape
+        segments, self.segments = self.segments, None
+        lines = segments.download(self.stream) if not segments.empty() else None
+        self.stream.waitForCompletion()
+        
+        if lines is None or lines.size == 0:
+            return None
+        
+        lines = lines.reshape(-1, 1, 4) - 1
+        np.clip(lines[..., 0::2], 0, width - 1, out=lines[..., 0::2])
+        np.clip(lines[..., 1::2], 0, height - 1, out=lines[..., 1::2])
+        return lines
+    
+    def detect_lines(self, gray: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Detect line segments in a grayscale frame.
+        
+        Args:
+            gray: Grayscale input image
+        
+        Returns:
+            Lines in cv2.HoughLinesP layout (N, 1, 4), or None
+        """
+        self.submit(gray)
+        return self.collect()
+
+
+def _intersect_all(
+    segments: np.ndarray,
+    height: float,
+    width: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Pairwise segment intersections inside the upper 70% of the frame."""
+    dx = segments[:, 0] - segments[:, 2]
+    dy = segments[:, 1] - segments[:, 3]
+    cross = segments[:, 0] * segments[:, 3] - segments[:, 1] * segments[:, 2]
+    
+    # Pairwise intersections over the upper triangle (i < j) in one shot.
+    i, j = np.triu_indices(len(segments), 1)
+    denom = dx[i] * dy[j] - dy[i] * dx[j]
+    valid = np.abs(denom) >= 1e-6
+    i, j, denom = i[valid], j[valid], denom[valid]
+    
+    px = (cross[i] * dx[j] - dx[i] * cross[j]) / denom
+    py = (cross[i] * dy[j] - dy[i] * cross[j]) / denom
+    
+    in_bounds = (px >= 0) & (px <= width) & (py >= 0) & (py <= height * 0.7)
+    return px[in_bounds], py[in_bounds]
+
+
+if nb is not None:
+    @nb.njit(cache=True, parallel=True, fastmath=True)
+    def _intersect_all_jit(
+        segments: np.ndarray,
+        height: float,
+        width: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Compiled variant of _intersect_all without (N, N) temporaries."""
+        n = segments.shape[0]
+        pairs = n * (n - 1) // 2
+        px = np.empty(pairs, dtype=np.float64)
+        py = np.empty(pairs, dtype=np.float64)
+        keep = np.zeros(pairs, dtype=np.bool_)
+        
+        for i in nb.prange(n):
+            x1, y1, x2, y2 = segments[i, 0], segments[i, 1], segments[i, 2], segments[i, 3]
+            dx_i = x1 - x2
+            dy_i = y1 - y2
+            cross_i = x1 * y2 - y1 * x2
+            offset = i * (2 * n - i - 1) // 2 - i - 1
+            for j in range(i + 1, n):
+                x3, y3, x4, y4 = segments[j, 0], segments[j, 1], segments[j, 2], segments[j, 3]
+                dx_j = x3 - x4
+                dy_j = y3 - y4
+                denom = dx_i * dy_j - dy_i * dx_j
+                if abs(denom) < 1e-6:
+                    continue
+                cross_j = x3 * y4 - y3 * x4
+                x = (cross_i * dx_j - dx_i * cross_j) / denom
+                y = (cross_i * dy_j - dy_i * cross_j) / denom
+                if 0 <= x <= width and 0 <= y <= height * 0.7:
+                    px[offset + j] = x
+                    py[offset + j] = y
+                    keep[offset + j] = True
+        
+        return px[keep], py[keep]
+
+
 def detect_vanishing_point(
     lines: Optional[np.ndarray],
     height: int,
@@ -134,59 +343,50 @@ def detect_vanishing_point(
     if lines is None or len(lines) < 2:
         return None
     
-    intersections: List[Tuple[float, float]] = []
-    
-    for i in range(len(lines)):
-        for j in range(i + 1, len(lines)):
-            x1, y1, x2, y2 = lines[i][0]
-            x3, y3, x4, y4 = lines[j][0]
-            
-            denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
-            if abs(denom) < 1e-6:
-                continue
-            
-            px = ((x1 * y2 - y1 * x2) * (x3 - x4) - (x1 - x2) * (x3 * y4 - y3 * x4)) / denom
-            py = ((x1 * y2 - y1 * x2) * (y3 - y4) - (y1 - y2) * (x3 * y4 - y3 * x4)) / denom
-            
-            if 0 <= px <= width and 0 <= py <= height * 0.7:
-                intersections.append((px, py))
-    
-    if len(intersections) < 3:
+    segments = lines.reshape(-1, 4).astype(np.float64)
+    if nb is not None:
+        px, py = _intersect_all_jit(segments, float(height), float(width))
+    else:
+        px, py = _intersect_all(segments, height, width)
+    
+    if px.size < 3:
         return None
     
-    points = np.array(intersections)
-    center_x = np.median(points[:, 0])
-    center_y = np.median(points[:, 1])
+    center_x = np.median(px)
+    center_y = np.median(py)
     
-    distances = np.sqrt((points[:, 0] - center_x) ** 2 + (points[:, 1] - center_y) ** 2)
+    distances = np.sqrt((px - center_x) ** 2 + (py - center_y) ** 2)
     inliers = np.sum(distances < 50)
-    confidence = min(inliers / max(len(intersections), 1), 1.0)
+    confidence = min(inliers / max(px.size, 1), 1.0)
     
     return VanishingPoint(x=center_x, y=center_y, confidence=confidence)
 
 
-def region_of_interest_adaptive(
-    edges: np.ndarray,
+def adaptive_roi_polygon(
+    height: int,
+    width: int,
     vanishing_point: Optional[VanishingPoint] = None,
     curve_info: Optional[CurveInfo] = None,
     top_offset: float = 0.58,
-    bottom_offset: float = 0.08
+    bottom_offset: float = 0.08,
+    out: Optional[np.ndarray] = None
 ) -> np.ndarray:
     """
-    Create adaptive region of interest mask based on vanishing point and curve info.
+    Compute the adaptive region of interest polygon.
     
     Args:
-        edges: Edge detection output
+        height: Image height
+        width: Image width
         vanishing_point: Detected vanishing point (or None for default)
         curve_info: Curve direction info for width adjustment
         top_offset: Vertical position of top edge (fraction of height)
         bottom_offset: Horizontal inset for bottom corners
+        out: Optional (1, 4, 2) int32 buffer to write the vertices into
     
     Returns:
-        Binary mask of the region of interest
+        Polygon vertices as a (1, 4, 2) int32 array
     """
-    height, width = edges.shape
-    mask = np.zeros_like(edges)
+    polygon = out if out is not None else np.empty((1, 4, 2), dtype=np.int32)
     
     if vanishing_point is not None and vanishing_point.confidence > 0.3:
         vp_x = vanishing_point.x
@@ -200,84 +400,154 @@ def region_of_interest_adaptive(
             elif curve_info.direction == "right":
                 curve_adjustment = width * 0.05 * curve_info.confidence
         
-        polygon = np.array([
-            [
-                (int(width * bottom_offset + curve_adjustment), height),
-                (int(vp_x - top_width / 2 + curve_adjustment), int(vp_y)),
-                (int(vp_x + top_width / 2 + curve_adjustment), int(vp_y)),
-                (int(width * (1 - bottom_offset) + curve_adjustment), height),
-            ]
-        ], dtype=np.int32)
-    else:
-        left_adjust = 0.0
-        right_adjust = 0.0
-        if curve_info is not None:
-            if curve_info.direction == "left":
-                left_adjust = -width * 0.03 * curve_info.confidence
-            elif curve_info.direction == "right":
-                right_adjust = width * 0.03 * curve_info.confidence
-        
-        polygon = np.array([
-            [
-                (int(width * 0.08 + left_adjust), height),
-                (int(width * 0.46 + left_adjust), int(height * top_offset)),
-                (int(width * 0.54 + right_adjust), int(height * top_offset)),
-                (int(width * 0.92 + right_adjust), height),
-            ]
-        ], dtype=np.int32)
+        polygon[0, 0] = (int(width * bottom_offset + curve_adjustment), height)
+        polygon[0, 1] = (int(vp_x - top_width / 2 + curve_adjustment), int(vp_y))
+        polygon[0, 2] = (int(vp_x + top_width / 2 + curve_adjustment), int(vp_y))
+        polygon[0, 3] = (int(width * (1 - bottom_offset) + curve_adjustment), height)
+        return polygon
+    
+    left_adjust = 0.0
+    right_adjust = 0.0
+    if curve_info is not None:
+        if curve_info.direction == "left":
+            left_adjust = -width * 0.03 * curve_info.confidence
+        elif curve_info.direction == "right":
+            right_adjust = width * 0.03 * curve_info.confidence
+    
+    polygon[0, 0] = (int(width * 0.08 + left_adjust), height)
+    polygon[0, 1] = (int(width * 0.46 + left_adjust), int(height * top_offset))
+    polygon[0, 2] = (int(width * 0.54 + right_adjust), int(height * top_offset))
+    polygon[0, 3] = (int(width * 0.92 + right_adjust), height)
+    return polygon
+
+
+def region_of_interest_adaptive(
+    edges: np.ndarray,
+    vanishing_point: Optional[VanishingPoint] = None,
+    curve_info: Optional[CurveInfo] = None,
+    top_offset: float = 0.58,
+    bottom_offset: float = 0.08
+) -> np.ndarray:
+    """
+    Create adaptive region of interest mask based on vanishing point and curve info.
+    
+    Args:
+        edges: Edge detection output
+        vanishing_point: Detected vanishing point (or None for default)
+        curve_info: Curve direction info for width adjustment
+        top_offset: Vertical position of top edge (fraction of height)
+        bottom_offset: Horizontal inset for bottom corners
     
+    Returns:
+        Binary mask of the region of interest
+    """
+    height, width = edges.shape
+    mask = np.zeros_like(edges)
+    polygon = adaptive_roi_polygon(
+        height, width, vanishing_point, curve_info, top_offset, bottom_offset
+    )
     cv2.fillPoly(mask, polygon, 255)
     return cv2.bitwise_and(edges, mask)
 
 
+def filter_lines_in_polygon(lines: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """
+    Keep only the line segments whose midpoint lies inside a polygon.
+    
+    Uses a vectorized even-odd ray casting test over all segments at once.
+    
+    Args:
+        lines: Hough lines from cv2.HoughLinesP
+        polygon: Polygon vertices, e.g. from adaptive_roi_polygon
+    
+    Returns:
+        Subset of lines inside the polygon, in the same layout as the input
+    """
+    segments = lines.reshape(-1, 4)
+    mid_x = (segments[:, 0] + segments[:, 2]) * 0.5
+    mid_y = (segments[:, 1] + segments[:, 3]) * 0.5
+    
+    vertices = polygon.reshape(-1, 2).astype(np.float64)
+    inside = np.zeros(len(segments), dtype=bool)
+    for k in range(len(vertices)):
+        x1, y1 = vertices[k - 1]
+        x2, y2 = vertices[k]
+        if y1 == y2:
+            continue
+        crosses = (y1 > mid_y) != (y2 > mid_y)
+        x_cross = x1 + (mid_y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (mid_x < x_cross)
+    
+    return lines[inside]
+
+
+def _get_gamma_table(gamma: float) -> np.ndarray:
+    """Return the cached uint8 gamma correction lookup table for gamma."""
+    table = _GAMMA_LUT_CACHE.get(gamma)
+    if table is None:
+        inv_gamma = 1.0 / gamma
+        table = (np.power(np.arange(256) / 255.0, inv_gamma) * 255.0).astype(np.uint8)
+        _GAMMA_LUT_CACHE[gamma] = table
+    return table
+
+
+def _get_clahe(clip_limit: float, grid_size: Tuple[int, int]) -> cv2.CLAHE:
+    """Return a cached CLAHE instance for the given parameters."""
+    cache = _thread_cache("clahe")
+    key = (clip_limit, tuple(grid_size))
+    clahe = cache.get(key)
+    if clahe is None:
+        clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=key[1])
+        cache[key] = clahe
+    return clahe
+
+
 def enhance_low_light(
     frame: np.ndarray,
     config: Optional[LaneDetectionConfig] = None
-) -> Tuple[np.ndarray, bool]:
+) -> Tuple[np.ndarray, np.ndarray, bool]:
     """
     Enhance image quality for low-light/night conditions.
     
-    Applies CLAHE and gamma correction when brightness is below threshold.
+    Applies CLAHE and gamma correction to the LAB luminance channel when
+    brightness is below threshold.
+    The grayscale image of the returned frame is handed back as well so
+    callers do not need to convert it again. When no enhancement is needed
+    the input frame itself is returned, so callers must not modify it.
     
     Args:
         frame: Input BGR image
         config: Detection configuration parameters
     
     Returns:
-        Tuple of (enhanced frame, was_enhanced flag)
+        Tuple of (enhanced frame, grayscale of enhanced frame, was_enhanced flag)
     """
     if config is None:
-        config = LaneDetectionConfig()
+        config = _DEFAULT_CONFIG
     
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    avg_brightness = np.mean(gray)
+    avg_brightness = cv2.mean(gray)[0]
     
     if avg_brightness >= config.brightness_threshold:
-        return frame.copy(), False
+        return frame, gray, False
     
     lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
     l_channel, a_channel, b_channel = cv2.split(lab)
     
-    clahe = cv2.createCLAHE(
-        clipLimit=config.clahe_clip_limit,
-        tileGridSize=config.clahe_grid_size
-    )
+    clahe = _get_clahe(config.clahe_clip_limit, config.clahe_grid_size)
     l_channel = clahe.apply(l_channel)
+    # Gamma only needs to touch luminance, so apply it before converting back
+    l_channel = cv2.LUT(l_channel, _get_gamma_table(config.gamma_low))
     
     lab = cv2.merge([l_channel, a_channel, b_channel])
     enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
     
-    gamma = config.gamma_low
-    inv_gamma = 1.0 / gamma
-    table = np.array([((i / 255.0) ** inv_gamma) * 255 for i in range(256)]).astype(np.uint8)
-    enhanced = cv2.LUT(enhanced, table)
-    
-    return enhanced, True
+    return enhanced, cv2.cvtColor(enhanced, cv2.COLOR_BGR2GRAY), True
 
 
 def detect_curve_direction(
-    left_lines: List[Tuple[int, int, int, int]],
-    right_lines: List[Tuple[int, int, int, int]],
+    left_lines: Lines,
+    right_lines: Lines,
     height: int,
     width: int
 ) -> CurveInfo:
@@ -287,37 +557,30 @@ def detect_curve_direction(
     Analyzes how slopes change from top to bottom of the frame.
     
     Args:
-        left_lines: List of left lane line segments
-        right_lines: List of right lane line segments
+        left_lines: Left lane line segments as an (N, 4) array
+        right_lines: Right lane line segments as an (N, 4) array
         height: Image height
         width: Image width
     
     Returns:
         CurveInfo with direction and confidence
     """
-    def compute_slope_trend(lines: List[Tuple[int, int, int, int]]) -> float:
+    def compute_slope_trend(lines: Lines) -> float:
         if len(lines) < 2:
             return 0.0
         
-        slopes_with_y = []
-        for x1, y1, x2, y2 in lines:
-            if abs(x2 - x1) < 1e-6:
-                continue
-            slope = (y2 - y1) / (x2 - x1)
-            avg_y = (y1 + y2) / 2
-            slopes_with_y.append((slope, avg_y))
-        
-        if len(slopes_with_y) < 2:
+        dx = lines[:, 2] - lines[:, 0]
+        valid = np.abs(dx) >= 1e-6
+        if np.count_nonzero(valid) < 2:
             return 0.0
         
-        slopes_with_y.sort(key=lambda x: x[1])
-        top_slopes = [s for s, y in slopes_with_y[:len(slopes_with_y) // 2]]
-        bottom_slopes = [s for s, y in slopes_with_y[len(slopes_with_y) // 2:]]
+        slopes = (lines[valid, 3] - lines[valid, 1]) / dx[valid]
+        avg_y = (lines[valid, 1] + lines[valid, 3]) / 2
         
-        if not top_slopes or not bottom_slopes:
-            return 0.0
+        slopes = slopes[np.argsort(avg_y, kind="stable")]
+        half = len(slopes) // 2
         
-        return np.mean(bottom_slopes) - np.mean(top_slopes)
+        return np.mean(slopes[half:]) - np.mean(slopes[:half])
     
     left_trend = compute_slope_trend(left_lines)
     right_trend = compute_slope_trend(right_lines)
@@ -343,7 +606,7 @@ def detect_curve_direction(
 
 
 def fit_lane_line(
-    lines: List[Tuple[int, int, int, int]],
+    lines: Lines,
     height: int,
     y_top_ratio: float = 0.6,
     use_polyfit: bool = False,
@@ -353,7 +616,7 @@ def fit_lane_line(
     Fit a line or polynomial to lane line segments.
     
     Args:
-        lines: List of line segments as (x1, y1, x2, y2) tuples
+        lines: Line segments as an (N, 4) array of (x1, y1, x2, y2) rows
         height: Image height
         y_top_ratio: Ratio for top y coordinate
         use_polyfit: If True, use polynomial fitting (degree 2)
@@ -362,29 +625,29 @@ def fit_lane_line(
     Returns:
         Line endpoints ((x_bottom, y_bottom), (x_top, y_top)) or None
     """
-    if not lines:
+    if len(lines) == 0:
         return None
     
-    points: List[Tuple[int, int]] = []
-    for x1, y1, x2, y2 in lines:
-        points.append((x1, y1))
-        points.append((x2, y2))
-    
-    if len(points) < 2:
-        return None
-    
-    ys = np.array([p[1] for p in points])
-    xs = np.array([p[0] for p in points])
+    xs = np.concatenate((lines[:, 0], lines[:, 2])).astype(np.float64)
+    ys = np.concatenate((lines[:, 1], lines[:, 3])).astype(np.float64)
     
     try:
-        if use_polyfit and len(points) >= poly_degree + 1:
+        if use_polyfit and len(xs) >= poly_degree + 1:
             coeffs = np.polyfit(ys, xs, poly_degree)
             y_bottom = height
             y_top = int(height * y_top_ratio)
             x_bottom = int(np.polyval(coeffs, y_bottom))
             x_top = int(np.polyval(coeffs, y_top))
         else:
-            m, b = np.polyfit(ys, xs, 1)
+            # Closed-form least squares for x = m * y + b.
+            n = xs.size
+            sum_x = xs.sum()
+            sum_y = ys.sum()
+            denom = n * np.dot(ys, ys) - sum_y * sum_y
+            if denom == 0:
+                return None
+            m = (n * np.dot(xs, ys) - sum_x * sum_y) / denom
+            b = (sum_x - m * sum_y) / n
             y_bottom = height
             y_top = int(height * y_top_ratio)
             x_bottom = int(m * y_bottom + b)
@@ -395,6 +658,16 @@ def fit_lane_line(
     return (x_bottom, y_bottom), (x_top, y_top)
 
 
+def _get_kernel(shape: int, size: int) -> np.ndarray:
+    """Return a cached square structuring element of the given shape and size."""
+    key = (shape, size)
+    kernel = _KERNEL_CACHE.get(key)
+    if kernel is None:
+        kernel = cv2.getStructuringElement(shape, (size, size))
+        _KERNEL_CACHE[key] = kernel
+    return kernel
+
+
 def apply_morphological_cleanup(
     mask: np.ndarray,
     kernel_size: int = 5,
@@ -409,24 +682,25 @@ def apply_morphological_cleanup(
         operation: Type of operation ("close", "open", "both")
     
     Returns:
-        Cleaned mask
+        Cleaned mask (a new array; the input mask is not modified)
     """
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
+    kernel = _get_kernel(cv2.MORPH_ELLIPSE, kernel_size)
     
-    cleaned = mask.copy()
+    cleaned: Optional[np.ndarray] = None
     
     if operation in ("close", "both"):
-        cleaned = cv2.morphologyEx(cleaned, cv2.MORPH_CLOSE, kernel)
+        cleaned = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
     if operation in ("open", "both"):
-        cleaned = cv2.morphologyEx(cleaned, cv2.MORPH_OPEN, kernel)
+        source = mask if cleaned is None else cleaned
+        cleaned = cv2.morphologyEx(source, cv2.MORPH_OPEN, kernel, dst=cleaned)
     
-    return cleaned
+    return cleaned if cleaned is not None else mask.copy()
 
 
 def classify_lines(
     lines: np.ndarray,
     config: Optional[LaneDetectionConfig] = None
-) -> Tuple[List[Tuple[int, int, int, int]], List[Tuple[int, int, int, int]]]:
+) -> Tuple[Lines, Lines]:
     """
     Classify Hough lines into left and right lane lines.
     
@@ -435,122 +709,251 @@ def classify_lines(
         config: Detection configuration
     
     Returns:
-        Tuple of (left_lines, right_lines)
+        Tuple of (left_lines, right_lines) as (N, 4) arrays
     """
     if config is None:
-        config = LaneDetectionConfig()
+        config = _DEFAULT_CONFIG
     
-    left_lines: List[Tuple[int, int, int, int]] = []
-    right_lines: List[Tuple[int, int, int, int]] = []
+    segments = lines.reshape(-1, 4)
+    dx = (segments[:, 2] - segments[:, 0]).astype(np.float64)
+    dy = (segments[:, 3] - segments[:, 1]).astype(np.float64)
     
-    for line in lines:
-        x1, y1, x2, y2 = line[0]
-        
-        if abs(x2 - x1) < 1e-6:
-            continue
-        
-        slope = (y2 - y1) / (x2 - x1)
-        
-        if abs(slope) < config.min_slope or abs(slope) > config.max_slope:
-            continue
-        
-        if slope < 0:
-            left_lines.append((x1, y1, x2, y2))
-        else:
-            right_lines.append((x1, y1, x2, y2))
+    valid = np.abs(dx) >= 1e-6
+    slope = np.divide(dy, dx, out=np.zeros_like(dy), where=valid)
+    magnitude = np.abs(slope)
+    keep = valid & (magnitude >= config.min_slope) & (magnitude <= config.max_slope)
     
-    return left_lines, right_lines
+    return segments[keep & (slope < 0)], segments[keep & (slope >= 0)]
 
 
-def build_lane_mask_v2(
+def _hough_params(config: LaneDetectionConfig) -> Tuple[int, int, int]:
+    """Hough (threshold, min line length, max gap) scaled to the processing resolution."""
+    scale = config.processing_scale
+    return (
+        max(1, int(round(config.hough_threshold * scale))),
+        max(1, int(round(config.hough_min_line_length * scale))),
+        max(1, int(round(config.hough_max_line_gap * scale))),
+    )
+
+
+def _get_gpu_pipeline(config: LaneDetectionConfig) -> GpuPipeline:
+    """Return the cached GpuPipeline for the config's detector parameters."""
+    key = (config.canny_low, config.canny_high, config.hough_theta) + _hough_params(config)
+    cache = _thread_cache("gpu_pipeline")
+    pipeline = cache.get(key)
+    if pipeline is None:
+        pipeline = GpuPipeline(config)
+        cache[key] = pipeline
+    return pipeline
+
+
+def _downscale(gray: np.ndarray, scale: float) -> np.ndarray:
+    """Resize a grayscale frame to the detection resolution."""
+    if scale == 1.0:
+        return gray
+    return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def _upscale_lines(lines: Optional[np.ndarray], scale: float) -> Optional[np.ndarray]:
+    """Map detection-resolution Hough endpoints back to full resolution."""
+    if lines is None or scale == 1.0:
+        return lines
+    return np.rint(lines / scale).astype(np.int32)
+
+
+def detect_lane_edges(gray: np.ndarray, config: LaneDetectionConfig) -> np.ndarray:
+    """
+    Blur and Canny a grayscale frame at config.processing_scale.
+    
+    Args:
+        gray: Full-resolution grayscale input image
+        config: Detection configuration
+    
+    Returns:
+        Edge map at the detection resolution
+    """
+    blur = cv2.GaussianBlur(_downscale(gray, config.processing_scale), (5, 5), 0)
+    return cv2.Canny(blur, config.canny_low, config.canny_high)
+
+
+def detect_lane_segments(
+    gray: np.ndarray,
+    config: LaneDetectionConfig,
+    roi_polygon: Optional[np.ndarray] = None,
+    edges: Optional[np.ndarray] = None
+) -> Optional[np.ndarray]:
+    """
+    Run blur, Canny and probabilistic Hough on a grayscale frame.
+    
+    Detection runs at config.processing_scale of the input resolution
+    (Hough parameters are scaled to match) and the returned endpoints are
+    mapped back to full-resolution coordinates.
+    
+    Uses the CUDA pipeline when a device is available and enabled in the
+    config, otherwise the CPU implementation. When roi_polygon is given the
+    edges are masked to it before Hough, which always runs on the CPU.
+    Passing the edges from detect_lane_edges skips recomputing them.
+    
+    Args:
+        gray: Grayscale input image
+        config: Detection configuration
+        roi_polygon: Optional full-resolution polygon to restrict edges to
+        edges: Optional precomputed output of detect_lane_edges for gray
+    
+    Returns:
+        Hough lines in cv2.HoughLinesP layout, or None if none found
+    """
+    scale = config.processing_scale
+    
+    if edges is None and roi_polygon is None and config.use_cuda and CUDA_AVAILABLE:
+        lines = _get_gpu_pipeline(config).detect_lines(_downscale(gray, scale))
+    else:
+        if edges is None:
+            edges = detect_lane_edges(gray, config)
+        if roi_polygon is not None:
+            mask = np.zeros_like(edges)
+            cv2.fillPoly(mask, np.rint(roi_polygon * scale).astype(np.int32), 255)
+            edges = cv2.bitwise_and(edges, mask)
+        threshold, min_line_length, max_line_gap = _hough_params(config)
+        lines = cv2.HoughLinesP(
+            edges,
+            1,
+            config.hough_theta,
+            threshold=threshold,
+            minLineLength=min_line_length,
+            maxLineGap=max_line_gap
+        )
+    
+    return _upscale_lines(lines, scale)
+
+
+def detect_lane_lines(
     frame: np.ndarray,
     config: Optional[LaneDetectionConfig] = None,
-    temporal_smoother: Optional[TemporalSmoother] = None,
-    night_mode: bool = False,
     curve_detection: bool = True,
-    polygon_fill: bool = True,
     use_polyfit: bool = False
-) -> Optional[np.ndarray]:
+) -> Optional[Tuple[Optional[np.ndarray], Optional[np.ndarray]]]:
     """
-    Generate an improved lane mask with advanced features.
+    Detect and fit the left and right lane lines in a frame.
     
-    This is the main entry point for lane mask generation with:
-    - Adaptive ROI based on vanishing point
-    - Night mode enhancement
-    - Curve-aware processing
-    - Polygon filling between lanes
-    - Temporal smoothing for video
+    This is the stateless part of build_lane_mask_v2 and is safe to run
+    concurrently on different frames.
     
     Args:
         frame: Input BGR image
         config: Detection configuration parameters
-        temporal_smoother: TemporalSmoother instance for video processing
-        night_mode: Force night mode enhancement
         curve_detection: Enable curve direction detection
-        polygon_fill: Fill polygon between lane lines (vs. thin lines)
         use_polyfit: Use polynomial fitting for curves
     
     Returns:
-        Binary lane mask or None if no lanes detected
+        Tuple of fitted (left, right) lines, either of which may be None,
+        or None if no line segments were found at all
     """
     if config is None:
-        config = LaneDetectionConfig()
-    
-    height, width = frame.shape[:2]
+        config = _DEFAULT_CONFIG
     
-    processed_frame = frame.copy()
-    enhanced = False
+    _, gray, _ = enhance_low_light(frame, config)
     
-    if night_mode:
-        processed_frame, enhanced = enhance_low_light(frame, config)
-    else:
-        processed_frame, enhanced = enhance_low_light(frame, config)
-    
-    gray = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2GRAY)
-    blur = cv2.GaussianBlur(gray, (5, 5), 0)
-    edges = cv2.Canny(blur, config.canny_low, config.canny_high)
-    
-    lines = cv2.HoughLinesP(
-        edges,
-        1,
-        np.pi / 180,
-        threshold=config.hough_threshold,
-        minLineLength=config.hough_min_line_length,
-        maxLineGap=config.hough_max_line_gap
-    )
+    # On the CPU path keep the edge map so the ROI fallback only redoes Hough
+    use_gpu = config.use_cuda and CUDA_AVAILABLE
+    edges = None if use_gpu else detect_lane_edges(gray, config)
+    lines = detect_lane_segments(gray, config, edges=edges)
     
     if lines is None:
         return None
     
+    return _fit_lane_lines(lines, gray, config, curve_detection, use_polyfit, edges)
+
+
+def _fit_lane_lines(
+    lines: np.ndarray,
+    gray: np.ndarray,
+    config: LaneDetectionConfig,
+    curve_detection: bool,
+    use_polyfit: bool,
+    edges: Optional[np.ndarray] = None
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """ROI-filter, classify and fit Hough segments into (left, right) lines."""
+    height, width = gray.shape
+    
     vp = detect_vanishing_point(lines, height, width)
     
     left_lines, right_lines = classify_lines(lines, config)
     
     curve_info: Optional[CurveInfo] = None
-    if curve_detection and left_lines and right_lines:
+    if curve_detection and len(left_lines) and len(right_lines):
         curve_info = detect_curve_direction(left_lines, right_lines, height, width)
     
-    masked = region_of_interest_adaptive(edges, vp, curve_info)
+    roi_polygon = adaptive_roi_polygon(height, width, vp, curve_info)
+    lines_in_roi = filter_lines_in_polygon(lines, roi_polygon)
     
-    lines_in_roi = cv2.HoughLinesP(
-        masked,
-        1,
-        np.pi / 180,
-        threshold=config.hough_threshold,
-        minLineLength=config.hough_min_line_length,
-        maxLineGap=config.hough_max_line_gap
-    )
+    # Too few segments survived the ROI: re-run Hough on the masked edges,
+    # where clutter outside the ROI no longer competes for votes
+    if len(lines_in_roi) < config.min_roi_lines:
+        masked_lines = detect_lane_segments(gray, config, roi_polygon, edges)
+        if masked_lines is not None:
+            masked_lines = filter_lines_in_polygon(masked_lines, roi_polygon)
+            if len(masked_lines) > len(lines_in_roi):
+                lines_in_roi = masked_lines
     
-    if lines_in_roi is None:
-        if temporal_smoother is not None and temporal_smoother.prev_mask is not None:
-            return temporal_smoother.prev_mask.copy()
-        return None
+    if len(lines_in_roi) == 0:
+        return None, None
     
     left_lines, right_lines = classify_lines(lines_in_roi, config)
     
     left = fit_lane_line(left_lines, height, use_polyfit=use_polyfit)
     right = fit_lane_line(right_lines, height, use_polyfit=use_polyfit)
     
+    return left, right
+
+
+def _lane_polygon(
+    left: np.ndarray,
+    right: np.ndarray,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Fill the (1, 4, 2) quad between two fitted lines, bottom-left first."""
+    polygon = out if out is not None else np.empty((1, 4, 2), dtype=np.int32)
+    polygon[0, 0] = left[0]
+    polygon[0, 1] = left[1]
+    polygon[0, 2] = right[1]
+    polygon[0, 3] = right[0]
+    return polygon
+
+
+def render_lane_mask(
+    lane_lines: Optional[Tuple[Optional[np.ndarray], Optional[np.ndarray]]],
+    height: int,
+    width: int,
+    config: Optional[LaneDetectionConfig] = None,
+    temporal_smoother: Optional[TemporalSmoother] = None,
+    polygon_fill: bool = True
+) -> Optional[np.ndarray]:
+    """
+    Draw the lane mask for lines returned by detect_lane_lines.
+    
+    This is the stateful part of build_lane_mask_v2: it applies temporal
+    smoothing, so frames of a video must be rendered in order.
+    
+    Args:
+        lane_lines: Output of detect_lane_lines
+        height: Image height
+        width: Image width
+        config: Detection configuration parameters
+        temporal_smoother: TemporalSmoother instance for video processing
+        polygon_fill: Fill polygon between lane lines (vs. thin lines)
+    
+    Returns:
+        Binary lane mask or None if no lanes detected
+    """
+    if config is None:
+        config = _DEFAULT_CONFIG
+    
+    if lane_lines is None:
+        return None
+    
+    left, right = lane_lines
+    
     if left is None and right is None:
         if temporal_smoother is not None and temporal_smoother.prev_mask is not None:
             return temporal_smoother.prev_mask.copy()
@@ -558,23 +961,19 @@ def build_lane_mask_v2(
     
     if temporal_smoother is not None:
         left, right = temporal_smoother.update(left, right)
-    
-    mask = np.zeros((height, width), dtype=np.uint8)
+        mask = temporal_smoother.mask_buffer((height, width))
+    else:
+        mask = np.zeros((height, width), dtype=np.uint8)
     
     if polygon_fill and left is not None and right is not None:
-        polygon = np.array([
-            [left[0][0], left[0][1]],
-            [left[1][0], left[1][1]],
-            [right[1][0], right[1][1]],
-            [right[0][0], right[0][1]],
-        ], dtype=np.int32)
-        cv2.fillPoly(mask, [polygon], 255)
+        out = temporal_smoother.poly_buf if temporal_smoother is not None else None
+        cv2.fillPoly(mask, _lane_polygon(left, right, out), 255)
     else:
         line_thickness = 10
         if left is not None:
-            cv2.line(mask, left[0], left[1], 255, thickness=line_thickness)
+            cv2.line(mask, tuple(left[0]), tuple(left[1]), 255, thickness=line_thickness)
         if right is not None:
-            cv2.line(mask, right[0], right[1], 255, thickness=line_thickness)
+            cv2.line(mask, tuple(right[0]), tuple(right[1]), 255, thickness=line_thickness)
     
     mask = apply_morphological_cleanup(mask, config.morph_kernel_size, operation="both")
     
@@ -584,6 +983,43 @@ def build_lane_mask_v2(
     return mask
 
 
+def build_lane_mask_v2(
+    frame: np.ndarray,
+    config: Optional[LaneDetectionConfig] = None,
+    temporal_smoother: Optional[TemporalSmoother] = None,
+    night_mode: bool = False,
+    curve_detection: bool = True,
+    polygon_fill: bool = True,
+    use_polyfit: bool = False
+) -> Optional[np.ndarray]:
+    """
+    Generate an improved lane mask with advanced features.
+    
+    This is the main entry point for lane mask generation with:
+    - Adaptive ROI based on vanishing point
+    - Night mode enhancement
+    - Curve-aware processing
+    - Polygon filling between lanes
+    - Temporal smoothing for video
+    - CUDA edge/line detection when a GPU is available
+    
+    Args:
+        frame: Input BGR image
+        config: Detection configuration parameters
+        temporal_smoother: TemporalSmoother instance for video processing
+        night_mode: Force night mode enhancement
+        curve_detection: Enable curve direction detection
+        polygon_fill: Fill polygon between lane lines (vs. thin lines)
+        use_polyfit: Use polynomial fitting for curves
+    
+    Returns:
+        Binary lane mask or None if no lanes detected
+    """
+    height, width = frame.shape[:2]
+    lane_lines = detect_lane_lines(frame, config, curve_detection, use_polyfit)
+    return render_lane_mask(lane_lines, height, width, config, temporal_smoother, polygon_fill)
+
+
 def build_lane_mask_single_lane(
     frame: np.ndarray,
     config: Optional[LaneDetectionConfig] = None,
@@ -604,34 +1040,12 @@ def build_lane_mask_single_lane(
         Binary lane mask or None
     """
     if config is None:
-        config = LaneDetectionConfig()
+        config = _DEFAULT_CONFIG
     
     height, width = frame.shape[:2]
     
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    blur = cv2.GaussianBlur(gray, (5, 5), 0)
-    edges = cv2.Canny(blur, config.canny_low, config.canny_high)
-    
-    default_mask = np.zeros_like(edges)
-    polygon = np.array([
-        [
-            (int(width * 0.08), height),
-            (int(width * 0.46), int(height * 0.58)),
-            (int(width * 0.54), int(height * 0.58)),
-            (int(width * 0.92), height),
-        ]
-    ], dtype=np.int32)
-    cv2.fillPoly(default_mask, polygon, 255)
-    masked = cv2.bitwise_and(edges, default_mask)
-    
-    lines = cv2.HoughLinesP(
-        masked,
-        1,
-        np.pi / 180,
-        threshold=config.hough_threshold,
-        minLineLength=config.hough_min_line_length,
-        maxLineGap=config.hough_max_line_gap
-    )
+    lines = detect_lane_segments(gray, config, adaptive_roi_polygon(height, width))
     
     if lines is None:
         return None
@@ -642,35 +1056,17 @@ def build_lane_mask_single_lane(
     
     mask = np.zeros((height, width), dtype=np.uint8)
     
-    if left_lines and not right_lines:
+    if len(left_lines) and not len(right_lines):
         left = fit_lane_line(left_lines, height)
         if left is not None:
-            right_estimated = (
-                (left[0][0] + lane_width_pixels, left[0][1]),
-                (left[1][0] + lane_width_pixels, left[1][1])
-            )
-            polygon = np.array([
-                [left[0][0], left[0][1]],
-                [left[1][0], left[1][1]],
-                [right_estimated[1][0], right_estimated[1][1]],
-                [right_estimated[0][0], right_estimated[0][1]],
-            ], dtype=np.int32)
-            cv2.fillPoly(mask, [polygon], 255)
-    
-    elif right_lines and not left_lines:
+            right_estimated = np.add(left, (lane_width_pixels, 0))
+            cv2.fillPoly(mask, _lane_polygon(left, right_estimated), 255)
+    
+    elif len(right_lines) and not len(left_lines):
         right = fit_lane_line(right_lines, height)
         if right is not None:
-            left_estimated = (
-                (right[0][0] - lane_width_pixels, right[0][1]),
-                (right[1][0] - lane_width_pixels, right[1][1])
-            )
-            polygon = np.array([
-                [left_estimated[0][0], left_estimated[0][1]],
-                [left_estimated[1][0], left_estimated[1][1]],
-                [right[1][0], right[1][1]],
-                [right[0][0], right[0][1]],
-            ], dtype=np.int32)
-            cv2.fillPoly(mask, [polygon], 255)
+            left_estimated = np.subtract(right, (lane_width_pixels, 0))
+            cv2.fillPoly(mask, _lane_polygon(left_estimated, right), 255)
     
     else:
         return None
@@ -713,3 +1109,102 @@ def process_frame_with_fallback(
         return mask
     
     return build_lane_mask_single_lane(frame, config)
+
+
+def _detect_lane_lines_cuda(
+    frames: Iterable[np.ndarray],
+    config: LaneDetectionConfig,
+    curve_detection: bool,
+    use_polyfit: bool
+) -> Iterator[Tuple[np.ndarray, Optional[Tuple[Optional[np.ndarray], Optional[np.ndarray]]]]]:
+    """
+    Detect lane lines for a frame stream with double-buffered GPU pipelines.
+    
+    Frame N is uploaded and queued on one CUDA stream while the segments of
+    frame N-1 are downloaded from the other and fitted on the CPU, so the
+    transfers overlap with host-side work.
+    """
+    pipelines = (GpuPipeline(config), GpuPipeline(config))
+    scale = config.processing_scale
+    in_flight: Optional[Tuple[np.ndarray, np.ndarray, GpuPipeline]] = None
+    
+    def collect(frame: np.ndarray, gray: np.ndarray, pipeline: GpuPipeline):
+        lines = _upscale_lines(pipeline.collect(), scale)
+        if lines is None:
+            return frame, None
+        return frame, _fit_lane_lines(lines, gray, config, curve_detection, use_polyfit)
+    
+    for index, frame in enumerate(frames):
+        _, gray, _ = enhance_low_light(frame, config)
+        pipeline = pipelines[index % 2]
+        pipeline.submit(_downscale(gray, scale))
+        if in_flight is not None:
+            yield collect(*in_flight)
+        in_flight = (frame, gray, pipeline)
+    
+    if in_flight is not None:
+        yield collect(*in_flight)
+
+
+def process_video_stream(
+    frames: Iterable[np.ndarray],
+    config: Optional[LaneDetectionConfig] = None,
+    temporal_smoother: Optional[TemporalSmoother] = None,
+    curve_detection: bool = True,
+    polygon_fill: bool = True,
+    use_polyfit: bool = False,
+    max_workers: Optional[int] = None
+) -> Iterator[Tuple[np.ndarray, Optional[np.ndarray]]]:
+    """
+    Generate lane masks for a stream of video frames using a thread pool.
+    
+    Line detection runs on worker threads (OpenCV releases the GIL), while
+    rendering, temporal smoothing and the single-lane fallback run on the
+    consuming thread in frame order. At most 2 * max_workers frames are in
+    flight at once. When CUDA is in use, detection instead runs on two
+    double-buffered GPU streams and max_workers is ignored.
+    
+    Args:
+        frames: Iterable of BGR frames in playback order
+        config: Detection configuration
+        temporal_smoother: For video smoothing
+        curve_detection: Enable curve detection
+        polygon_fill: Fill polygon between lanes
+        use_polyfit: Use polynomial fitting for curves
+        max_workers: Number of detection threads (default: CPU count)
+    
+    Yields:
+        Tuples of (frame, lane mask or None) in input order
+    """
+    if config is None:
+        config = _DEFAULT_CONFIG
+    
+    def finish(frame, lane_lines) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        height, width = frame.shape[:2]
+        mask = render_lane_mask(
+            lane_lines, height, width, config, temporal_smoother, polygon_fill
+        )
+        if mask is None:
+            mask = build_lane_mask_single_lane(frame, config)
+        return frame, mask
+    
+    if config.use_cuda and CUDA_AVAILABLE:
+        for frame, lane_lines in _detect_lane_lines_cuda(frames, config, curve_detection, use_polyfit):
+            yield finish(frame, lane_lines)
+        return
+    
+    max_workers = max_workers or os.cpu_count() or 1
+    pending: Deque[Tuple[np.ndarray, Future]] = deque()
+    
+    def drain_one() -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        frame, future = pending.popleft()
+        return finish(frame, future.result())
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for frame in frames:
+            future = executor.submit(detect_lane_lines, frame, config, curve_detection, use_polyfit)
+            pending.append((frame, future))
+            if len(pending) >= 2 * max_workers:
+                yield drain_one()
+        while pending:
+            yield drain_one()
@@ -10,28 +10,61 @@ curve detection labels.
 import argparse
 import json
 import logging
-import random
+import math
+import os
+import re
 import shutil
+import subprocess
 import sys
+import tempfile
+import threading
+from array import array
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any, cast
+from typing import Deque, Dict, Iterator, List, Optional, Tuple, Any, cast
 
 import cv2
 import numpy as np
 
+from _lane_kernels import LaneLine, fit_lane_line, split_lane_segments
+from lane_preprocessing import CUDA_AVAILABLE
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 logger = logging.getLogger(__name__)
 
+
 DEFAULT_FPS = 2.0
 DEFAULT_MAX_FRAMES = 300
 TRAIN_RATIO = 0.8
 BRIGHTNESS_THRESHOLD = 100
 CURVE_ANGLE_THRESHOLD = 0.15
+LANE_DETECTION_WIDTH = 640
+LANE_LINE_WIDTH = 10
+MIN_POLYGON_AREA = 200
+JPEG_QUALITY = 90
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+MIN_IMAGE_BYTES = 100
+FRAME_BATCH_SIZE = 8
+FRAME_BATCH_BYTES = 32 * 1024 * 1024
+COPY_WORKERS = 16
 
 
 class Scenario(Enum):
@@ -57,6 +90,65 @@ class FrameMetadata:
     angle_variance: float
 
 
+SCENARIOS = list(Scenario)
+CURVE_TYPES = list(CurveType)
+
+
+class MetadataTable:
+    """
+    Column-oriented store for frame metadata.
+
+    Scenario and curve type are kept as uint8 codes (index into the enum's
+    member order) and numeric fields as float64 columns, so counting and
+    splitting scan contiguous arrays instead of per-frame objects.
+    """
+
+    def __init__(self) -> None:
+        self.frame_ids: List[str] = []
+        self.source_videos: List[str] = []
+        self._scenarios = array("B")
+        self._curve_types = array("B")
+        self._brightness = array("d")
+        self._angle_variance = array("d")
+
+    def __len__(self) -> int:
+        return len(self.frame_ids)
+
+    def append(self, meta: FrameMetadata) -> None:
+        """
+        Append one frame's metadata as a new row.
+
+        Args:
+            meta: Frame metadata record.
+        """
+        self.frame_ids.append(meta.frame_id)
+        self.source_videos.append(meta.source_video)
+        self._scenarios.append(SCENARIOS.index(meta.scenario))
+        self._curve_types.append(CURVE_TYPES.index(meta.curve_type))
+        self._brightness.append(meta.brightness)
+        self._angle_variance.append(meta.angle_variance)
+
+    @property
+    def scenarios(self) -> np.ndarray:
+        """Scenario codes as a uint8 array."""
+        return np.array(self._scenarios, dtype=np.uint8)
+
+    @property
+    def curve_types(self) -> np.ndarray:
+        """Curve type codes as a uint8 array."""
+        return np.array(self._curve_types, dtype=np.uint8)
+
+    @property
+    def brightness(self) -> np.ndarray:
+        """Mean brightness values as a float64 array."""
+        return np.array(self._brightness, dtype=np.float64)
+
+    @property
+    def angle_variance(self) -> np.ndarray:
+        """Lane angle variances as a float64 array."""
+        return np.array(self._angle_variance, dtype=np.float64)
+
+
 @dataclass
 class DatasetStats:
     """Statistics for the generated dataset."""
@@ -71,6 +163,38 @@ class DatasetStats:
     skipped_frames: int
 
 
+class AsyncWriter:
+    """
+    Write files on background threads so disk latency overlaps processing.
+
+    At most 4 * max_workers writes are queued; submitting beyond that waits
+    for the oldest write, which also surfaces write errors early.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._pending: Deque[Future] = deque()
+        self._max_pending = 4 * max_workers
+
+    def submit(self, path: Path, data: bytes) -> None:
+        """
+        Queue a write of data to path.
+
+        Args:
+            path: Destination file path.
+            data: File contents.
+        """
+        if len(self._pending) >= self._max_pending:
+            self._pending.popleft().result()
+        self._pending.append(self._executor.submit(path.write_bytes, data))
+
+    def close(self) -> None:
+        """Wait for all queued writes and re-raise the first failure."""
+        self._executor.shutdown(wait=True)
+        while self._pending:
+            self._pending.popleft().result()
+
+
 def parse_args() -> argparse.Namespace:
     """
     Parse command-line arguments.
@@ -119,6 +243,12 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Balance train/val split across day/night scenarios",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for lane detection (1 disables the pool)",
+    )
     return parser.parse_args()
 
 
@@ -133,23 +263,37 @@ def list_videos(root: Path) -> List[Path]:
         Sorted list of video file paths.
     """
     videos = []
-    videos.extend(root.glob("**/nav_capture_*.mp4"))
-    videos.extend(root.glob("**/M_video/*.MP4"))
-    return sorted(set(videos))
+    for dirpath, _, filenames in os.walk(root):
+        in_dvr_folder = os.path.basename(dirpath) == "M_video"
+        for name in filenames:
+            if (name.startswith("nav_capture_") and name.endswith(".mp4")) or (
+                in_dvr_folder and name.endswith(".MP4")
+            ):
+                videos.append(Path(dirpath) / name)
+    return sorted(videos)
 
 
-def region_of_interest(edges: np.ndarray) -> np.ndarray:
+_ROI_CACHE: Dict[Tuple[int, int], np.ndarray] = {}
+
+
+def _roi_mask(height: int, width: int) -> np.ndarray:
     """
-    Apply a trapezoidal mask to focus on the road region.
+    Return the trapezoidal road-region mask for a frame size.
+
+    The mask is built once per (height, width) and cached; the cached array
+    is read-only.
 
     Args:
-        edges: Edge detection output image.
+        height: Frame height in pixels.
+        width: Frame width in pixels.
 
     Returns:
-        Masked edge image focusing on road region.
+        uint8 mask with 255 inside the road region.
     """
-    height, width = edges.shape
-    mask = np.zeros_like(edges)
+    mask = _ROI_CACHE.get((height, width))
+    if mask is not None:
+        return mask
+    mask = np.zeros((height, width), dtype=np.uint8)
     polygon = np.array(
         [
             [
@@ -162,74 +306,172 @@ def region_of_interest(edges: np.ndarray) -> np.ndarray:
         dtype=np.int32,
     )
     cv2.fillPoly(mask, [polygon], (255,))
-    return cv2.bitwise_and(edges, mask)
+    mask.flags.writeable = False
+    _ROI_CACHE[(height, width)] = mask
+    return mask
 
 
-def fit_lane_line(
-    lines: List[Tuple[int, int, int, int]], height: int
-) -> Optional[Tuple[Tuple[int, int], Tuple[int, int], float]]:
+def region_of_interest(edges: np.ndarray) -> np.ndarray:
     """
-    Fit a single lane line from multiple line segments.
+    Apply a trapezoidal mask to focus on the road region.
 
     Args:
-        lines: List of line segments as (x1, y1, x2, y2) tuples.
-        height: Image height for extrapolation.
+        edges: Edge detection output image.
 
     Returns:
-        Tuple of ((x_bottom, y_bottom), (x_top, y_top), angle) or None.
+        Masked edge image focusing on road region.
     """
-    if not lines:
+    height, width = edges.shape
+    return cv2.bitwise_and(edges, _roi_mask(height, width))
+
+
+class _GpuLanePipeline:
+    """
+    Blur, Canny, road-region mask and Hough segment detection on a CUDA device.
+
+    Device buffers and filters are created once and reused for every frame;
+    the road-region mask is only re-uploaded when the frame size changes.
+    """
+
+    def __init__(self) -> None:
+        self.stream = cv2.cuda_Stream()
+        self.gpu_gray = cv2.cuda_GpuMat()
+        self.gpu_roi = cv2.cuda_GpuMat()
+        self.roi_shape: Tuple[int, int] = (0, 0)
+        self.gaussian = cv2.cuda.createGaussianFilter(cv2.CV_8UC1, cv2.CV_8UC1, (5, 5), 0)
+        self.canny = cv2.cuda.createCannyEdgeDetector(50, 150)
+        self.hough = cv2.cuda.createHoughSegmentDetector(1, np.pi / 180, 50, 180, 4096, 50)
+
+    def detect_lines(self, gray: np.ndarray, scale: float) -> Optional[np.ndarray]:
+        """
+        Detect road-region line segments in a grayscale frame.
+
+        Args:
+            gray: Grayscale input image.
+            scale: Downscale factor already applied to the frame, used to
+                scale the Hough parameters as on the CPU path.
+
+        Returns:
+            Lines in cv2.HoughLinesP layout (N, 1, 4), or None.
+        """
+        if gray.shape != self.roi_shape:
+            self.gpu_roi.upload(_roi_mask(*gray.shape))
+            self.roi_shape = gray.shape
+        self.hough.setThreshold(max(1, int(round(50 * scale))))
+        self.hough.setMinLineLength(int(round(50 * scale)))
+        self.hough.setMaxLineGap(int(round(180 * scale)))
+
+        self.gpu_gray.upload(gray, self.stream)
+        blur = self.gaussian.apply(self.gpu_gray, stream=self.stream)
+        edges = self.canny.detect(blur, stream=self.stream)
+        masked = cv2.cuda.bitwise_and(edges, self.gpu_roi, stream=self.stream)
+        segments = self.hough.detect(masked, stream=self.stream)
+        lines = segments.download(self.stream) if not segments.empty() else None
+        self.stream.waitForCompletion()
+
+        if lines is None or lines.size == 0:
+            return None
+        return lines.reshape(-1, 1, 4)
+
+
+# Each pipeline owns a CUDA stream and scratch buffers, so threads get their own.
+_GPU_LOCAL = threading.local()
+
+
+def _detect_lines_cuda(gray: np.ndarray, scale: float) -> Optional[np.ndarray]:
+    """Run line detection on this thread's lazily created GPU pipeline."""
+    pipeline = getattr(_GPU_LOCAL, "pipeline", None)
+    if pipeline is None:
+        pipeline = _GPU_LOCAL.pipeline = _GpuLanePipeline()
+    return pipeline.detect_lines(gray, scale)
+
+
+def lane_line_polygon(line: LaneLine, height: int, width: int) -> Optional[List[float]]:
+    """
+    Convert a fitted lane line to a YOLO polygon of width LANE_LINE_WIDTH.
+
+    The quad is built around the line analytically and intersected with the
+    frame, so no mask has to be rasterized and traced back into contours.
+
+    Args:
+        line: Fitted lane line as ((x_bottom, y_bottom), (x_top, y_top), angle).
+        height: Frame height in pixels.
+        width: Frame width in pixels.
+
+    Returns:
+        Polygon as [x1, y1, ..., x4, y4] normalized coordinates, or None if
+        less than MIN_POLYGON_AREA of it lies inside the frame.
+    """
+    (x_bottom, y_bottom), (x_top, y_top), _ = line
+    dx = x_top - x_bottom
+    dy = y_top - y_bottom
+    length = math.hypot(dx, dy)
+    if length == 0:
         return None
-    points = []
-    for x1, y1, x2, y2 in lines:
-        points.append((x1, y1))
-        points.append((x2, y2))
-    if len(points) < 2:
+    offset_x = -dy / length * LANE_LINE_WIDTH / 2
+    offset_y = dx / length * LANE_LINE_WIDTH / 2
+
+    quad = np.array(
+        [
+            (x_bottom - offset_x, y_bottom - offset_y),
+            (x_bottom + offset_x, y_bottom + offset_y),
+            (x_top + offset_x, y_top + offset_y),
+            (x_top - offset_x, y_top - offset_y),
+        ],
+        dtype=np.float32,
+    )
+    frame_rect = np.array(
+        [(0, 0), (width, 0), (width, height), (0, height)], dtype=np.float32
+    )
+    area, clipped = cv2.intersectConvexConvex(quad, frame_rect)
+    if clipped is None or area < MIN_POLYGON_AREA:
         return None
-    ys = np.array([p[1] for p in points])
-    xs = np.array([p[0] for p in points])
-    m, b = np.polyfit(ys, xs, 1)
-    y_bottom = height
-    y_top = int(height * 0.6)
-    x_bottom = int(m * y_bottom + b)
-    x_top = int(m * y_top + b)
-    angle = np.arctan(m)
-    return (x_bottom, y_bottom), (x_top, y_top), angle
+
+    return (clipped.reshape(-1, 2) / (width, height)).ravel().tolist()
 
 
-def build_lane_mask(frame: np.ndarray) -> Optional[Tuple[np.ndarray, float]]:
+def build_lane_polygons(
+    frame: np.ndarray, gray: Optional[np.ndarray] = None
+) -> Optional[Tuple[List[List[float]], float]]:
     """
-    Build a lane mask from a frame and compute angle variance.
+    Build lane polygons from a frame and compute angle variance.
+
+    Edge and line detection run on a copy downscaled to LANE_DETECTION_WIDTH
+    (Hough parameters scaled to match); the fitted lines are mapped back to
+    the frame's full resolution and emitted directly as polygons. Detection
+    runs on the GPU via cv2.cuda when a CUDA device is present.
 
     Args:
         frame: Input BGR image.
+        gray: Optional precomputed grayscale of the frame.
 
     Returns:
-        Tuple of (lane mask, angle variance) or None if no lanes detected.
+        Tuple of (YOLO polygons, angle variance) or None if no lanes detected.
     """
     height, width = frame.shape[:2]
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    blur = cv2.GaussianBlur(gray, (5, 5), 0)
-    edges = cv2.Canny(blur, 50, 150)
-    masked = region_of_interest(edges)
-    lines = cv2.HoughLinesP(
-        masked, 1, np.pi / 180, threshold=50, minLineLength=50, maxLineGap=180
-    )
+    if gray is None:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    scale = min(1.0, LANE_DETECTION_WIDTH / width)
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    if CUDA_AVAILABLE:
+        lines = _detect_lines_cuda(gray, scale)
+    else:
+        blur = cv2.GaussianBlur(gray, (5, 5), 0)
+        edges = cv2.Canny(blur, 50, 150)
+        masked = region_of_interest(edges)
+        lines = cv2.HoughLinesP(
+            masked,
+            1,
+            np.pi / 180,
+            threshold=max(1, int(round(50 * scale))),
+            minLineLength=50 * scale,
+            maxLineGap=180 * scale,
+        )
     if lines is None:
         return None
 
-    left_lines = []
-    right_lines = []
-    for x1, y1, x2, y2 in lines[:, 0]:
-        if x2 == x1:
-            continue
-        slope = (y2 - y1) / (x2 - x1)
-        if abs(slope) < 0.5:
-            continue
-        if slope < 0:
-            left_lines.append((x1, y1, x2, y2))
-        else:
-            right_lines.append((x1, y1, x2, y2))
+    left_lines, right_lines = split_lane_segments(lines[:, 0] / scale, 0.5)
 
     left = fit_lane_line(left_lines, height)
     right = fit_lane_line(right_lines, height)
@@ -241,52 +483,43 @@ def build_lane_mask(frame: np.ndarray) -> Optional[Tuple[np.ndarray, float]]:
     right_angle = right[2]
     angle_variance = abs(left_angle - right_angle)
 
-    mask = np.zeros((height, width), dtype=np.uint8)
-    cv2.line(mask, left[0], left[1], (255,), thickness=10)
-    cv2.line(mask, right[0], right[1], (255,), thickness=10)
+    polygons = []
+    for line in (left, right):
+        polygon = lane_line_polygon(line, height, width)
+        if polygon is not None:
+            polygons.append(polygon)
 
-    return mask, angle_variance
+    return polygons, angle_variance
 
 
-def mask_to_polygons(mask: np.ndarray) -> List[List[float]]:
+def classify_brightness(frame: np.ndarray) -> Tuple[Scenario, float]:
     """
-    Convert a binary mask to YOLO polygon format.
+    Classify lighting scenario based on brightness histogram.
 
     Args:
-        mask: Binary mask image.
+        frame: Input BGR image.
 
     Returns:
-        List of polygons, each as [x1, y1, x2, y2, ...] normalized coordinates.
+        Tuple of (Scenario enum, mean brightness value).
     """
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    polygons = []
-    height, width = mask.shape
-    for contour in contours:
-        area = cv2.contourArea(contour)
-        if area < 200:
-            continue
-        approx = cv2.approxPolyDP(contour, 2.0, True)
-        coords = []
-        for point in approx[:, 0, :]:
-            x, y = point.tolist()
-            coords.extend([x / width, y / height])
-        if len(coords) >= 6:
-            polygons.append(coords)
-    return polygons
+    # Mean luma from the per-channel means (BT.601), without a gray buffer
+    blue, green, red, _ = cv2.mean(frame)
+    brightness = 0.114 * blue + 0.587 * green + 0.299 * red
+    scenario = Scenario.DAY if brightness >= BRIGHTNESS_THRESHOLD else Scenario.NIGHT
+    return scenario, brightness
 
 
-def classify_brightness(frame: np.ndarray) -> Tuple[Scenario, float]:
+def classify_brightness_gray(gray: np.ndarray) -> Tuple[Scenario, float]:
     """
-    Classify lighting scenario based on brightness histogram.
+    Classify lighting scenario from an already converted grayscale image.
 
     Args:
-        frame: Input BGR image.
+        gray: Grayscale image.
 
     Returns:
         Tuple of (Scenario enum, mean brightness value).
     """
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    brightness = float(np.mean(gray))
+    brightness = cv2.mean(gray)[0]
     scenario = Scenario.DAY if brightness >= BRIGHTNESS_THRESHOLD else Scenario.NIGHT
     return scenario, brightness
 
@@ -306,44 +539,66 @@ def classify_curve(angle_variance: float) -> CurveType:
 
 def validate_image(image_path: Path) -> bool:
     """
-    Validate that an image file is readable and not corrupt.
+    Cheaply check that a file looks like a JPEG or PNG image.
+
+    Only the file signature and size are inspected; the image is not
+    decoded, so callers that go on to read it should treat a failed
+    cv2.imread as the authoritative corruption check.
 
     Args:
         image_path: Path to image file.
 
     Returns:
-        True if image is valid, False otherwise.
+        True if image looks valid, False otherwise.
     """
-    if not image_path.exists():
+    try:
+        with image_path.open("rb") as f:
+            header = f.read(len(PNG_SIGNATURE))
+        return (
+            header.startswith(JPEG_SIGNATURE) or header == PNG_SIGNATURE
+        ) and image_path.stat().st_size > MIN_IMAGE_BYTES
+    except OSError:
         return False
-    img = cv2.imread(str(image_path))
-    return img is not None and img.size > 0
 
 
-def validate_label(label_path: Path) -> bool:
+def parse_label(label_path: Path) -> Optional[List[np.ndarray]]:
     """
-    Validate that a label file exists and has valid YOLO format.
+    Parse the polygon coordinates of a YOLO segmentation label file.
+
+    Lines with fewer than three points are ignored. All coordinates are
+    converted in a single NumPy call and range-checked together.
 
     Args:
         label_path: Path to label file.
 
     Returns:
-        True if label is valid, False otherwise.
+        List of per-polygon coordinate arrays, or None if the file is
+        missing or has non-numeric or out-of-range coordinates.
     """
     if not label_path.exists():
-        return False
+        return None
     try:
-        with label_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                parts = line.strip().split()
-                if len(parts) < 7:
-                    continue
-                coords = [float(x) for x in parts[1:]]
-                if not all(0 <= c <= 1 for c in coords):
-                    return False
-        return True
+        rows = [line.split()[1:] for line in label_path.read_text(encoding="utf-8").splitlines()]
+        rows = [row for row in rows if len(row) >= 6]
+        values = np.array([token for row in rows for token in row], dtype=np.float64)
     except (ValueError, IOError):
-        return False
+        return None
+    if not ((values >= 0) & (values <= 1)).all():
+        return None
+    return np.split(values, np.cumsum([len(row) for row in rows])[:-1]) if rows else []
+
+
+def validate_label(label_path: Path) -> bool:
+    """
+    Validate that a label file exists and has valid YOLO format.
+
+    Args:
+        label_path: Path to label file.
+
+    Returns:
+        True if label is valid, False otherwise.
+    """
+    return parse_label(label_path) is not None
 
 
 def setup_output_directories(output_root: Path) -> Tuple[Path, Path, Path, Path]:
@@ -388,27 +643,43 @@ def write_data_yaml(output_root: Path) -> None:
     logger.info(f"Written data.yaml to {data_yaml}")
 
 
-def write_metadata(output_root: Path, metadata: List[FrameMetadata]) -> None:
+def write_metadata(output_root: Path, metadata: MetadataTable) -> None:
     """
     Write frame metadata to JSON file.
 
+    Rows are serialized one at a time into a JSON array with one object per
+    line, so the full document is never held in memory.
+
     Args:
         output_root: Root output directory.
-        metadata: List of frame metadata objects.
+        metadata: Frame metadata table.
     """
     metadata_file = output_root / "metadata.json"
-    data = [
-        {
-            "frame_id": m.frame_id,
-            "source_video": m.source_video,
-            "scenario": m.scenario.value,
-            "curve_type": m.curve_type.value,
-            "brightness": round(m.brightness, 2),
-            "angle_variance": round(m.angle_variance, 4),
-        }
-        for m in metadata
-    ]
-    metadata_file.write_text(json.dumps(data, indent=2))
+    rows = zip(
+        metadata.frame_ids,
+        metadata.source_videos,
+        metadata.scenarios.tolist(),
+        metadata.curve_types.tolist(),
+        metadata.brightness.tolist(),
+        metadata.angle_variance.tolist(),
+    )
+    with metadata_file.open("wb") as f:
+        f.write(b"[")
+        for i, (frame_id, source_video, scenario, curve_type, brightness, angle_variance) in enumerate(rows):
+            f.write(b",\n" if i else b"\n")
+            f.write(
+                _dumps(
+                    {
+                        "frame_id": frame_id,
+                        "source_video": source_video,
+                        "scenario": SCENARIOS[scenario].value,
+                        "curve_type": CURVE_TYPES[curve_type].value,
+                        "brightness": round(brightness, 2),
+                        "angle_variance": round(angle_variance, 4),
+                    }
+                )
+            )
+        f.write(b"\n]\n")
     logger.info(f"Written metadata for {len(metadata)} frames to {metadata_file}")
 
 
@@ -436,133 +707,382 @@ def write_summary(output_root: Path, stats: DatasetStats) -> None:
     logger.info(f"Written summary to {summary_file}")
 
 
+def count_categories(metadata: MetadataTable) -> Tuple[int, int, int, int]:
+    """
+    Count frames per lighting scenario and curve type in one pass.
+
+    Args:
+        metadata: Frame metadata table.
+
+    Returns:
+        Tuple of (day, night, straight, curved) frame counts.
+    """
+    total = len(metadata)
+    day_frames = int(np.count_nonzero(metadata.scenarios == SCENARIOS.index(Scenario.DAY)))
+    curved_frames = int(
+        np.count_nonzero(metadata.curve_types == CURVE_TYPES.index(CurveType.CURVED))
+    )
+    return day_frames, total - day_frames, total - curved_frames, curved_frames
+
+
 def split_balanced(
-    metadata: List[FrameMetadata], train_ratio: float, seed: int
-) -> Tuple[List[FrameMetadata], List[FrameMetadata]]:
+    metadata: MetadataTable, train_ratio: float, seed: int
+) -> Tuple[np.ndarray, np.ndarray]:
     """
     Create balanced train/val split across scenarios.
 
     Args:
-        metadata: List of all frame metadata.
+        metadata: Frame metadata table.
         train_ratio: Ratio of training samples (0.0 to 1.0).
         seed: Random seed for reproducibility.
 
     Returns:
-        Tuple of (train_metadata, val_metadata) lists.
+        Tuple of (train, val) row index arrays.
     """
-    random.seed(seed)
+    rng = np.random.default_rng(seed)
 
-    day_frames = [m for m in metadata if m.scenario == Scenario.DAY]
-    night_frames = [m for m in metadata if m.scenario == Scenario.NIGHT]
+    scenarios = metadata.scenarios
+    day_frames = np.flatnonzero(scenarios == SCENARIOS.index(Scenario.DAY))
+    night_frames = np.flatnonzero(scenarios == SCENARIOS.index(Scenario.NIGHT))
 
-    random.shuffle(day_frames)
-    random.shuffle(night_frames)
+    rng.shuffle(day_frames)
+    rng.shuffle(night_frames)
 
     day_split = int(len(day_frames) * train_ratio)
     night_split = int(len(night_frames) * train_ratio)
 
-    train = day_frames[:day_split] + night_frames[:night_split]
-    val = day_frames[day_split:] + night_frames[night_split:]
+    train = np.concatenate([day_frames[:day_split], night_frames[:night_split]])
+    val = np.concatenate([day_frames[day_split:], night_frames[night_split:]])
 
-    random.shuffle(train)
-    random.shuffle(val)
+    rng.shuffle(train)
+    rng.shuffle(val)
 
     return train, val
 
 
 def split_simple(
-    metadata: List[FrameMetadata], train_ratio: float, seed: int
-) -> Tuple[List[FrameMetadata], List[FrameMetadata]]:
+    metadata: MetadataTable, train_ratio: float, seed: int
+) -> Tuple[np.ndarray, np.ndarray]:
     """
     Create simple random train/val split.
 
     Args:
-        metadata: List of all frame metadata.
+        metadata: Frame metadata table.
         train_ratio: Ratio of training samples (0.0 to 1.0).
         seed: Random seed for reproducibility.
 
     Returns:
-        Tuple of (train_metadata, val_metadata) lists.
+        Tuple of (train, val) row index arrays.
     """
-    random.seed(seed)
-    metadata_copy = metadata.copy()
-    random.shuffle(metadata_copy)
-    split_idx = int(len(metadata_copy) * train_ratio)
-    return metadata_copy[:split_idx], metadata_copy[split_idx:]
+    order = np.random.default_rng(seed).permutation(len(metadata))
+    split_idx = int(len(order) * train_ratio)
+    return order[:split_idx], order[split_idx:]
 
 
-def process_video(
-    video: Path,
-    fps: float,
-    max_frames: int,
-    current_count: int,
-) -> Tuple[List[Tuple[np.ndarray, List[List[float]], FrameMetadata]], bool]:
+def probe_video(video: Path) -> Optional[Tuple[int, int, float]]:
     """
-    Process a single video and extract lane frames.
+    Read the frame size and frame rate of a video without decoding it.
 
     Args:
         video: Path to video file.
-        fps: Target frames per second to extract.
-        max_frames: Maximum total frames to extract.
-        current_count: Current frame count from previous videos.
 
     Returns:
-        Tuple of (frame data list, reached_max_frames flag).
+        Tuple of (width, height, fps) or None if the video cannot be opened.
     """
-    frames_data = []
-
     cap = cv2.VideoCapture(str(video))
     if not cap.isOpened():
+        return None
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    return width, height, video_fps
+
+
+def _read_frames_opencv(video: Path, step: int) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Decode every frame with OpenCV and yield every step-th one.
+
+    Hardware decoding is requested when the capture is opened; OpenCV
+    falls back to software decoding when no accelerator is available.
+
+    Args:
+        video: Path to video file.
+        step: Source frame interval between yielded frames.
+
+    Yields:
+        Tuples of (source frame index, BGR frame).
+    """
+    cap = cv2.VideoCapture(
+        str(video),
+        cv2.CAP_ANY,
+        [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+    )
+    try:
+        idx = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if idx % step == 0:
+                yield idx, frame
+            idx += 1
+    finally:
+        cap.release()
+
+
+@lru_cache(maxsize=None)
+def _ffmpeg_passthrough_args() -> Tuple[str, ...]:
+    """
+    Return the ffmpeg options that pass selected frames through unchanged.
+
+    ffmpeg 5.1 replaced the deprecated -vsync with -fps_mode; older builds
+    only understand -vsync 0. Builds whose version cannot be parsed (such
+    as git snapshots) are assumed to be recent.
+
+    Returns:
+        Tuple of ffmpeg command-line options.
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-version"], capture_output=True, text=True, check=False
+        )
+    except OSError:
+        return ("-fps_mode", "passthrough")
+    match = re.match(r"ffmpeg version n?(\d+)\.(\d+)", result.stdout)
+    if match and (int(match.group(1)), int(match.group(2))) < (5, 1):
+        return ("-vsync", "0")
+    return ("-fps_mode", "passthrough")
+
+
+def extract_frames_stream(video: Path, fps: float) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Stream frames sampled at the target rate from a video.
+
+    ffmpeg selects every step-th frame and pipes raw BGR frames, so skipped
+    frames are never converted or copied into Python. ffmpeg uses a hardware
+    decoder when one is available. Falls back to OpenCV decoding when ffmpeg
+    is not on PATH or fails before producing any frame; ffmpeg errors are
+    logged.
+
+    Args:
+        video: Path to video file.
+        fps: Target frames per second to extract.
+
+    Yields:
+        Tuples of (source frame index, BGR frame).
+    """
+    info = probe_video(video)
+    if info is None:
         logger.warning(f"Could not open video: {video}")
-        return frames_data, False
+        return
 
-    video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    width, height, video_fps = info
     step = max(1, int(round(video_fps / fps)))
-    idx = 0
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+    if shutil.which("ffmpeg") is None or width <= 0 or height <= 0:
+        yield from _read_frames_opencv(video, step)
+        return
 
-        if idx % step != 0:
-            idx += 1
-            continue
+    cmd = [
+        "ffmpeg", "-v", "error", "-hwaccel", "auto", "-i", str(video),
+        "-vf", f"select=not(mod(n\\,{step}))", *_ffmpeg_passthrough_args(),
+        "-f", "rawvideo", "-pix_fmt", "bgr24", "-",
+    ]
+    frame_size = width * height * 3
+    # stderr goes to a file rather than a pipe so a chatty decoder cannot block on it.
+    with tempfile.TemporaryFile() as errors:
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=errors
+        )
+        stdout = cast(Any, proc.stdout)
+        yielded = 0
+        try:
+            idx = 0
+            while True:
+                buffer = stdout.read(frame_size)
+                if len(buffer) < frame_size:
+                    break
+                yield idx, np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 3)
+                yielded += 1
+                idx += step
+            returncode = proc.wait()
+        finally:
+            stdout.close()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+
+        if returncode != 0:
+            errors.seek(0)
+            message = errors.read().decode("utf-8", "replace").strip()
+            logger.warning(f"ffmpeg failed on {video.name} (exit {returncode}): {message}")
+            if not yielded:
+                logger.info(f"Falling back to OpenCV decoding for {video.name}")
+                yield from _read_frames_opencv(video, step)
+
+
+def _init_frame_worker() -> None:
+    """Keep each pool worker's OpenCV single-threaded to avoid oversubscription."""
+    cv2.setNumThreads(1)
+
+
+def _process_frame_batch(
+    video_stem: str,
+    video_name: str,
+    batch: List[Tuple[int, np.ndarray]],
+) -> List[Tuple[bytes, List[List[float]], FrameMetadata]]:
+    """
+    Run lane detection and classification on a batch of frames.
+
+    Runs in a worker process; frames are JPEG-encoded here at JPEG_QUALITY
+    so encoding runs in parallel and only the bytes travel back to the
+    parent, which hands them to AsyncWriter.
 
-        result = build_lane_mask(frame)
+    Args:
+        video_stem: Source video file stem used for frame ids.
+        video_name: Source video file name.
+        batch: List of (source frame index, BGR frame) tuples.
+
+    Returns:
+        List of (JPEG bytes, polygons, metadata) for frames with lanes.
+    """
+    results = []
+    for idx, frame in batch:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        result = build_lane_polygons(frame, gray)
         if result is None:
-            idx += 1
             continue
 
-        lane_mask, angle_variance = result
-        polygons = mask_to_polygons(lane_mask)
+        polygons, angle_variance = result
         if not polygons:
-            idx += 1
             continue
 
-        scenario, brightness = classify_brightness(frame)
+        scenario, brightness = classify_brightness_gray(gray)
         curve_type = classify_curve(angle_variance)
 
-        frame_id = f"{video.stem}_{idx:06d}"
         metadata = FrameMetadata(
-            frame_id=frame_id,
-            source_video=video.name,
+            frame_id=f"{video_stem}_{idx:06d}",
+            source_video=video_name,
             scenario=scenario,
             curve_type=curve_type,
             brightness=brightness,
             angle_variance=angle_variance,
         )
 
-        frames_data.append((frame, polygons, metadata))
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        if ok:
+            results.append((encoded.tobytes(), polygons, metadata))
+    return results
 
-        if current_count + len(frames_data) >= max_frames:
-            cap.release()
-            return frames_data, True
 
-        idx += 1
+def _iter_batches(
+    frames: Iterator[Tuple[int, np.ndarray]],
+    batch_size: int,
+    max_bytes: int = FRAME_BATCH_BYTES,
+) -> Iterator[List[Tuple[int, np.ndarray]]]:
+    """
+    Group a frame stream into lists of at most batch_size frames.
 
-    cap.release()
-    return frames_data, False
+    A batch is also closed once its frames reach max_bytes, so large
+    frames travel to the workers in smaller batches.
+
+    Args:
+        frames: Iterator of (source frame index, BGR frame) tuples.
+        batch_size: Maximum frames per batch.
+        max_bytes: Maximum total frame bytes per batch.
+
+    Yields:
+        Lists of (source frame index, BGR frame) tuples.
+    """
+    batch: List[Tuple[int, np.ndarray]] = []
+    batch_bytes = 0
+    for item in frames:
+        batch.append(item)
+        batch_bytes += item[1].nbytes
+        if len(batch) >= batch_size or batch_bytes >= max_bytes:
+            yield batch
+            batch = []
+            batch_bytes = 0
+    if batch:
+        yield batch
+
+
+def process_video(
+    video: Path,
+    fps: float,
+    max_frames: int,
+    current_count: int,
+    executor: Optional[Executor] = None,
+    workers: int = 1,
+) -> Tuple[List[Tuple[bytes, List[List[float]], FrameMetadata]], bool]:
+    """
+    Process a single video and extract lane frames.
+
+    Frames are dispatched to the executor in batches of at most
+    FRAME_BATCH_SIZE frames or FRAME_BATCH_BYTES, keeping at most two
+    batches per worker in flight, and results are merged back in frame
+    order. Without an executor batches run in-process.
+
+    Args:
+        video: Path to video file.
+        fps: Target frames per second to extract.
+        max_frames: Maximum total frames to extract.
+        current_count: Current frame count from previous videos.
+        executor: Optional process pool for per-frame lane detection.
+        workers: Worker count of the executor, bounding batches in flight.
+
+    Returns:
+        Tuple of (list of (JPEG bytes, polygons, metadata), reached_max_frames flag).
+    """
+    frames_data: List[Tuple[bytes, List[List[float]], FrameMetadata]] = []
+    max_pending = 2 * max(1, workers)
+    pending: Deque[Future] = deque()
+
+    def collect(results: List[Tuple[bytes, List[List[float]], FrameMetadata]]) -> bool:
+        for item in results:
+            frames_data.append(item)
+            if current_count + len(frames_data) >= max_frames:
+                return True
+        return False
+
+    with closing(extract_frames_stream(video, fps)) as frames:
+        for batch in _iter_batches(frames, FRAME_BATCH_SIZE):
+            if executor is None:
+                if collect(_process_frame_batch(video.stem, video.name, batch)):
+                    return frames_data, True
+                continue
+
+            pending.append(
+                executor.submit(_process_frame_batch, video.stem, video.name, batch)
+            )
+            if len(pending) >= max_pending and collect(pending.popleft().result()):
+                break
+        else:
+            while pending:
+                if collect(pending.popleft().result()):
+                    break
+
+    reached_max = current_count + len(frames_data) >= max_frames
+    for future in pending:
+        future.cancel()
+    return frames_data, reached_max
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """
+    Hardlink a file into place, falling back to a full copy.
+
+    Args:
+        src: Source file path.
+        dst: Destination file path.
+    """
+    try:
+        if dst.exists():
+            dst.unlink()
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
 
 
 def process_existing_dataset(
@@ -600,7 +1120,7 @@ def process_existing_dataset(
         logger.warning("No images found in existing dataset")
         return None
 
-    metadata = []
+    metadata = MetadataTable()
     skipped = 0
 
     for img_path in image_files:
@@ -610,7 +1130,8 @@ def process_existing_dataset(
             skipped += 1
             continue
 
-        if not validate_label(label_path):
+        polygons = parse_label(label_path)
+        if polygons is None:
             skipped += 1
             continue
 
@@ -621,23 +1142,14 @@ def process_existing_dataset(
 
         scenario, brightness = classify_brightness(frame)
 
-        with label_path.open("r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        angles = []
-        for line in lines:
-            parts = line.strip().split()
-            if len(parts) >= 7:
-                coords = [float(x) for x in parts[1:]]
-                if len(coords) >= 6:
-                    x_coords = coords[::2]
-                    if len(x_coords) >= 3:
-                        angle = np.arctan2(
-                            coords[3] - coords[1], coords[2] - coords[0]
-                        )
-                        angles.append(angle)
-
-        angle_variance = float(np.var(angles)) if angles else 0.0
+        if polygons:
+            first_edges = np.array([coords[:4] for coords in polygons])
+            angles = np.arctan2(
+                first_edges[:, 3] - first_edges[:, 1], first_edges[:, 2] - first_edges[:, 0]
+            )
+            angle_variance = float(np.var(angles))
+        else:
+            angle_variance = 0.0
         curve_type = classify_curve(angle_variance)
 
         metadata.append(
@@ -653,51 +1165,58 @@ def process_existing_dataset(
             )
         )
 
-    if not metadata:
+    if len(metadata) == 0:
         logger.warning("No valid frames found in existing dataset")
         return None
 
     if balance_scenarios:
-        train_meta, val_meta = split_balanced(metadata, train_ratio, seed)
+        train_idx, val_idx = split_balanced(metadata, train_ratio, seed)
     else:
-        train_meta, val_meta = split_simple(metadata, train_ratio, seed)
+        train_idx, val_idx = split_simple(metadata, train_ratio, seed)
 
-    for m in train_meta:
-        src_img = images_dir / f"{m.frame_id}.jpg"
-        src_label = labels_dir / f"{m.frame_id}.txt"
-        dst_img = train_images / f"{m.frame_id}.jpg"
-        dst_label = train_labels / f"{m.frame_id}.txt"
+    copies: List[Tuple[Path, Path]] = []
+    for index in train_idx:
+        frame_id = metadata.frame_ids[index]
+        src_img = images_dir / f"{frame_id}.jpg"
+        src_label = labels_dir / f"{frame_id}.txt"
+        dst_img = train_images / f"{frame_id}.jpg"
+        dst_label = train_labels / f"{frame_id}.txt"
 
         if src_img.suffix == ".png":
-            dst_img = train_images / f"{m.frame_id}.png"
+            dst_img = train_images / f"{frame_id}.png"
 
         if overwrite or not dst_img.exists():
-            shutil.copy2(src_img, dst_img)
+            copies.append((src_img, dst_img))
         if overwrite or not dst_label.exists():
-            shutil.copy2(src_label, dst_label)
+            copies.append((src_label, dst_label))
 
-    for m in val_meta:
-        src_img = images_dir / f"{m.frame_id}.jpg"
-        src_label = labels_dir / f"{m.frame_id}.txt"
-        dst_img = val_images / f"{m.frame_id}.jpg"
-        dst_label = val_labels / f"{m.frame_id}.txt"
+    for index in val_idx:
+        frame_id = metadata.frame_ids[index]
+        src_img = images_dir / f"{frame_id}.jpg"
+        src_label = labels_dir / f"{frame_id}.txt"
+        dst_img = val_images / f"{frame_id}.jpg"
+        dst_label = val_labels / f"{frame_id}.txt"
 
         if src_img.suffix == ".png":
-            dst_img = val_images / f"{m.frame_id}.png"
+            dst_img = val_images / f"{frame_id}.png"
 
         if overwrite or not dst_img.exists():
-            shutil.copy2(src_img, dst_img)
+            copies.append((src_img, dst_img))
         if overwrite or not dst_label.exists():
-            shutil.copy2(src_label, dst_label)
+            copies.append((src_label, dst_label))
+
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+        list(executor.map(lambda pair: _fast_copy(*pair), copies))
 
+    day_frames, night_frames, straight_frames, curved_frames = count_categories(metadata)
     stats = DatasetStats(
         total_frames=len(metadata),
-        train_frames=len(train_meta),
-        val_frames=len(val_meta),
-        day_frames=sum(1 for m in metadata if m.scenario == Scenario.DAY),
-        night_frames=sum(1 for m in metadata if m.scenario == Scenario.NIGHT),
-        straight_frames=sum(1 for m in metadata if m.curve_type == CurveType.STRAIGHT),
-        curved_frames=sum(1 for m in metadata if m.curve_type == CurveType.CURVED),
+        train_frames=len(train_idx),
+        val_frames=len(val_idx),
+        day_frames=day_frames,
+        night_frames=night_frames,
+        straight_frames=straight_frames,
+        curved_frames=curved_frames,
         videos_processed=0,
         skipped_frames=skipped,
     )
@@ -736,61 +1255,78 @@ def main() -> None:
             output_root
         )
 
-        all_metadata: List[FrameMetadata] = []
+        all_metadata = MetadataTable()
         frame_count = 0
+        train_count = 0
+        val_count = 0
         videos_processed = 0
         skipped_frames = 0
-
-        for video in videos:
-            logger.info(f"Processing: {video.name}")
-
-            frames_data, reached_max = process_video(
-                video, args.fps, args.max_frames, frame_count
-            )
-
-            for frame, polygons, meta in frames_data:
-                if meta.scenario == Scenario.DAY:
-                    img_dir = train_images if frame_count % 5 != 0 else val_images
-                    lbl_dir = train_labels if frame_count % 5 != 0 else val_labels
-                else:
-                    img_dir = train_images if frame_count % 5 != 0 else val_images
-                    lbl_dir = train_labels if frame_count % 5 != 0 else val_labels
-
-                image_path = img_dir / f"{meta.frame_id}.jpg"
-                label_path = lbl_dir / f"{meta.frame_id}.txt"
-
-                if image_path.exists() and not args.overwrite:
-                    skipped_frames += 1
-                    continue
-
-                cv2.imwrite(str(image_path), frame)
-                with label_path.open("w", encoding="utf-8") as f:
-                    for polygon in polygons:
-                        f.write("0 " + " ".join(f"{v:.6f}" for v in polygon) + "\n")
-
-                all_metadata.append(meta)
-                frame_count += 1
-
-            videos_processed += 1
-
-            if reached_max:
-                break
-
-        train_count = len(list(train_images.glob("*.jpg")))
-        val_count = len(list(val_images.glob("*.jpg")))
-
+        # CUDA contexts do not survive fork, so the GPU path runs in-process.
+        use_pool = args.workers > 1 and not CUDA_AVAILABLE
+        executor = (
+            ProcessPoolExecutor(max_workers=args.workers, initializer=_init_frame_worker)
+            if use_pool
+            else None
+        )
+        writer = AsyncWriter()
+
+        try:
+            for video in videos:
+                logger.info(f"Processing: {video.name}")
+
+                frames_data, reached_max = process_video(
+                    video, args.fps, args.max_frames, frame_count, executor, args.workers
+                )
+
+                for encoded, polygons, meta in frames_data:
+                    is_train = frame_count % 5 != 0
+                    img_dir = train_images if is_train else val_images
+                    lbl_dir = train_labels if is_train else val_labels
+
+                    image_path = img_dir / f"{meta.frame_id}.jpg"
+                    label_path = lbl_dir / f"{meta.frame_id}.txt"
+
+                    if image_path.exists() and not args.overwrite:
+                        skipped_frames += 1
+                        continue
+
+                    writer.submit(image_path, encoded)
+                    writer.submit(
+                        label_path,
+                        "".join(
+                            "0 " + " ".join(f"{v:.6f}" for v in polygon) + "\n"
+                            for polygon in polygons
+                        ).encode("utf-8"),
+                    )
+
+                    all_metadata.append(meta)
+                    frame_count += 1
+                    if is_train:
+                        train_count += 1
+                    else:
+                        val_count += 1
+
+                videos_processed += 1
+
+                if reached_max:
+                    break
+        finally:
+            # Drain queued writes and stop the workers even if a video fails.
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            writer.close()
+
+        day_frames, night_frames, straight_frames, curved_frames = count_categories(
+            all_metadata
+        )
         stats = DatasetStats(
             total_frames=frame_count,
             train_frames=train_count,
             val_frames=val_count,
-            day_frames=sum(1 for m in all_metadata if m.scenario == Scenario.DAY),
-            night_frames=sum(1 for m in all_metadata if m.scenario == Scenario.NIGHT),
-            straight_frames=sum(
-                1 for m in all_metadata if m.curve_type == CurveType.STRAIGHT
-            ),
-            curved_frames=sum(
-                1 for m in all_metadata if m.curve_type == CurveType.CURVED
-            ),
+            day_frames=day_frames,
+            night_frames=night_frames,
+            straight_frames=straight_frames,
+            curved_frames=curved_frames,
             videos_processed=videos_processed,
             skipped_frames=skipped_frames,
         )
@@ -4,15 +4,34 @@ import json
 import os
 import re
 import shutil
+import subprocess
 import sys
 import tempfile
+import threading
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from itertools import repeat
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps_line(record: Dict[str, object]) -> bytes:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_line(record: Dict[str, object]) -> bytes:
+        return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
 
 STAMP_PATTERN = re.compile(r".+_(\d{8}_\d{6})\.")
+FRAME_EXTRACTION_BATCH = 8
+ZIP_EXTRACT_WORKERS = 8
 
 
 def parse_args() -> argparse.Namespace:
@@ -46,6 +65,12 @@ def parse_args() -> argparse.Namespace:
         default=2.0,
         help="Frame extraction rate (fps) when --extract-frames is set."
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for metadata parsing, copying and frame extraction."
+    )
     return parser.parse_args()
 
 
@@ -68,40 +93,99 @@ def collect_exports(inputs: Iterable[str]) -> List[Tuple[str, Path]]:
     return exports
 
 
+def is_capture_file(name: str) -> bool:
+    folder, _, base = name.rpartition("/")
+    return folder == "capture" and (
+        (base.startswith("metadata_") and base.endswith(".jsonl"))
+        or (base.startswith("nav_capture_") and base.endswith(".mp4"))
+    )
+
+
+def extract_zip(zip_path: Path, extract_path: Path) -> None:
+    root = extract_path.resolve()
+    local = threading.local()
+    opened: List[zipfile.ZipFile] = []
+
+    def extract_member(job: Tuple[zipfile.ZipInfo, Path]) -> None:
+        info, target = job
+        # ZipFile keeps a single file position, so every thread reads through its own handle.
+        archive = getattr(local, "archive", None)
+        if archive is None:
+            archive = local.archive = zipfile.ZipFile(zip_path, "r")
+            opened.append(archive)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with archive.open(info) as src, target.open("wb") as dst:
+            if info.file_size:
+                shutil.copyfileobj(src, dst, min(info.file_size, 1 << 20))
+
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        # Only capture metadata and videos are read downstream; leave the rest in the archive.
+        members = [info for info in zf.infolist() if is_capture_file(info.filename)]
+    jobs: List[Tuple[zipfile.ZipInfo, Path]] = []
+    for info in members:
+        target = (root / info.filename).resolve()
+        if root not in target.parents:
+            print(f"Skipping unsafe zip member: {info.filename}")
+            continue
+        jobs.append((info, target))
+    try:
+        with ThreadPoolExecutor(max_workers=ZIP_EXTRACT_WORKERS) as executor:
+            list(executor.map(extract_member, jobs))
+    finally:
+        for archive in opened:
+            archive.close()
+
+
 def extract_export(source: Tuple[str, Path]) -> Tuple[Path, Optional[tempfile.TemporaryDirectory]]:
     kind, path = source
     if kind == "dir":
         return path, None
     temp_dir = tempfile.TemporaryDirectory()
     extract_path = Path(temp_dir.name)
-    with zipfile.ZipFile(path, "r") as zf:
-        zf.extractall(extract_path)
+    extract_zip(path, extract_path)
     return extract_path, temp_dir
 
 
 def stamp_from_name(name: str) -> Optional[str]:
+    # Usual case: "<prefix>_YYYYMMDD_HHMMSS.<ext>", checked by slicing before the last dot.
+    stem = name.rpartition(".")[0]
+    stamp = stem[-15:]
+    if (
+        len(stem) > 16
+        and stem[-16] == "_"
+        and stamp[8] == "_"
+        and stamp[:8].isdecimal()
+        and stamp[9:].isdecimal()
+    ):
+        return stamp
     match = STAMP_PATTERN.match(name)
     return match.group(1) if match else None
 
 
-def build_video_index(capture_dir: Path) -> Dict[str, Path]:
-    index: Dict[str, Path] = {}
-    for video in capture_dir.glob("nav_capture_*.mp4"):
-        stamp = stamp_from_name(video.name)
-        if stamp:
-            index[stamp] = video
-    return index
+def scan_capture_dir(capture_dir: Path) -> Tuple[Dict[str, Path], List[Path]]:
+    # One directory pass for both the video index and the metadata file list.
+    video_index: Dict[str, Path] = {}
+    metadata_files: List[Path] = []
+    with os.scandir(capture_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith("nav_capture_") and name.endswith(".mp4"):
+                stamp = stamp_from_name(name)
+                if stamp:
+                    video_index[stamp] = capture_dir / name
+            elif name.startswith("metadata_") and name.endswith(".jsonl"):
+                metadata_files.append(capture_dir / name)
+    metadata_files.sort()
+    return video_index, metadata_files
 
 
 def extract_locations(metadata_file: Path) -> List[Dict[str, object]]:
     records: List[Dict[str, object]] = []
-    with metadata_file.open("r", encoding="utf-8") as handle:
+    with metadata_file.open("rb") as handle:
         for line in handle:
-            line = line.strip()
-            if not line:
-                continue
+            # Blank lines fail to parse and are skipped like malformed ones.
             try:
-                event = json.loads(line)
+                event = _loads(line)
             except json.JSONDecodeError:
                 continue
             if event.get("type") != "location":
@@ -145,16 +229,78 @@ def copy_media_files(
     return mapping
 
 
-def extract_frames(output_dir: Path, video_path: Path, frame_rate: float) -> None:
+def frame_extraction_command(jobs: List[Tuple[Path, Path]], frame_rate: float) -> List[str]:
+    command = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+    for _, video_path in jobs:
+        command.extend(["-threads", "0", "-i", str(video_path)])
+    graph = ";".join(f"[{index}:v]fps={frame_rate}[out{index}]" for index in range(len(jobs)))
+    command.extend(["-filter_complex", graph])
+    for index, (output_dir, _) in enumerate(jobs):
+        command.extend(["-map", f"[out{index}]", str(output_dir / "frame_%06d.jpg")])
+    return command
+
+
+def run_ffmpeg(command: List[str]) -> bool:
+    result = subprocess.run(
+        command,
+        check=False,
+        # Parallel ffmpeg runs must not read the shared terminal for interactive commands.
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    if result.returncode != 0:
+        print(f"ffmpeg exited with {result.returncode}: {result.stderr.strip()}")
+        return False
+    return True
+
+
+def extract_frame_batch(batch: List[Tuple[Path, Path]], frame_rate: float) -> None:
+    if not run_ffmpeg(frame_extraction_command(batch, frame_rate)) and len(batch) > 1:
+        # One unreadable video fails the whole invocation; retry individually.
+        for job in batch:
+            run_ffmpeg(frame_extraction_command([job], frame_rate))
+
+
+def extract_frames_many(
+    jobs: List[Tuple[Path, Path]],
+    frame_rate: float,
+    workers: int = 1
+) -> None:
+    if not jobs:
+        return
     if shutil.which("ffmpeg") is None:
         print("ffmpeg not found; skipping frame extraction.")
         return
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_pattern = output_dir / "frame_%06d.jpg"
-    os.system(
-        f"ffmpeg -hide_banner -loglevel error -i \"{video_path}\" "
-        f"-vf fps={frame_rate} \"{output_pattern}\""
-    )
+    for output_dir, _ in jobs:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    batch_size = max(1, min(FRAME_EXTRACTION_BATCH, -(-len(jobs) // max(1, workers))))
+    batches = [jobs[start:start + batch_size] for start in range(0, len(jobs), batch_size)]
+    # Each batch blocks on its own ffmpeg process, so threads are enough to run them in parallel.
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        list(executor.map(extract_frame_batch, batches, repeat(frame_rate)))
+
+
+def process_stamp(
+    capture_dir: Path,
+    metadata_file: Path,
+    video_index: Dict[str, Path],
+    output_root: Path,
+    copy_media: bool
+) -> Tuple[Optional[str], List[Dict[str, object]], Dict[str, Dict[str, str]]]:
+    stamp = stamp_from_name(metadata_file.name)
+    records = extract_locations(metadata_file)
+    video = video_index.get(stamp) if stamp else None
+    for record in records:
+        record["captureStamp"] = stamp
+        record["metadataFile"] = str(metadata_file)
+        record["videoFile"] = str(video) if video else None
+
+    mapping: Dict[str, Dict[str, str]] = {}
+    if copy_media and stamp:
+        mapping = copy_media_files(capture_dir, output_root / "captures", [stamp])
+    return stamp, records, mapping
 
 
 def main() -> None:
@@ -165,47 +311,51 @@ def main() -> None:
     summary_path = output_root / "summary.json"
     all_records: List[Dict[str, object]] = []
     capture_mapping: Dict[str, Dict[str, str]] = {}
+    frame_jobs: List[Tuple[Path, Path]] = []
 
     exports = collect_exports(args.input)
     if not exports:
         print("No valid exports found.")
         sys.exit(1)
 
-    for export in exports:
-        extract_path, temp_dir = extract_export(export)
-        try:
-            capture_dir = extract_path / "capture"
-            if not capture_dir.exists():
-                print(f"Missing capture directory: {extract_path}")
-                continue
-            video_index = build_video_index(capture_dir)
-            metadata_files = sorted(capture_dir.glob("metadata_*.jsonl"))
-            for metadata_file in metadata_files:
-                stamp = stamp_from_name(metadata_file.name)
-                records = extract_locations(metadata_file)
-                for record in records:
-                    record["captureStamp"] = stamp
-                    record["metadataFile"] = str(metadata_file)
-                    video = video_index.get(stamp) if stamp else None
-                    record["videoFile"] = str(video) if video else None
-                all_records.extend(records)
-
-                if args.copy_media and stamp:
-                    mapping = copy_media_files(capture_dir, output_root / "captures", [stamp])
+    executor = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    stamp_map = executor.map if executor is not None else map
+    try:
+        for export in exports:
+            extract_path, temp_dir = extract_export(export)
+            try:
+                capture_dir = extract_path / "capture"
+                if not capture_dir.exists():
+                    print(f"Missing capture directory: {extract_path}")
+                    continue
+                video_index, metadata_files = scan_capture_dir(capture_dir)
+                # Results come back in submission order so the manifest stays deterministic.
+                results = stamp_map(
+                    process_stamp,
+                    repeat(capture_dir),
+                    metadata_files,
+                    repeat(video_index),
+                    repeat(output_root),
+                    repeat(args.copy_media)
+                )
+                for stamp, records, mapping in results:
+                    all_records.extend(records)
                     capture_mapping.update(mapping)
                     if args.extract_frames and stamp in mapping and "video" in mapping[stamp]:
-                        extract_frames(
-                            output_root / "frames" / stamp,
-                            Path(mapping[stamp]["video"]),
-                            args.frame_rate
+                        frame_jobs.append(
+                            (output_root / "frames" / stamp, Path(mapping[stamp]["video"]))
                         )
-        finally:
-            if temp_dir is not None:
-                temp_dir.cleanup()
+            finally:
+                if temp_dir is not None:
+                    temp_dir.cleanup()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    extract_frames_many(frame_jobs, args.frame_rate, args.workers)
 
-    with manifest_path.open("w", encoding="utf-8") as handle:
-        for record in all_records:
-            handle.write(json.dumps(record) + "\n")
+    with manifest_path.open("wb", buffering=1 << 20) as handle:
+        handle.writelines(_dumps_line(record) for record in all_records)
 
     summary = {
         "generatedAt": datetime.utcnow().isoformat() + "Z",
@@ -1,19 +1,84 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
 import json
+import os
+import queue
+import shutil
 import subprocess
 import sys
+import threading
 import time
 from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    import numba as nb
+except ImportError:
+    nb = None
+
+try:
+    from blake3 import blake3 as _frame_hasher
+except ImportError:
+    from hashlib import sha256 as _frame_hasher
+
+try:
+    from torchcodec.decoders import VideoDecoder
+except ImportError:
+    VideoDecoder = None
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+
+    def _dumps_line(record: Dict[str, object]) -> bytes:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: object) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def _dumps_line(record: Dict[str, object]) -> bytes:
+        return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
 
 MPS_FAST_THRESHOLD = 12.0
 MPS_MODERATE_THRESHOLD = 6.0
 MPH_TO_MPS = 1 / 2.23694
 STATE_FILE = "pipeline_state.json"
+MS_PER_HOUR = 3_600_000
+NUMBER_TYPES = {int, float, bool}
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+RESULT_QUEUE_SIZE = 8
+VIDEO_PREFIX = "nav_capture_"
+INFERENCE_CHUNK_BATCHES = 4
+DETECTION_CACHE_LIMIT = 100_000
+
+# (capture stamp, frame name, image path or decoded BGR frame)
+FrameSource = Tuple[str, str, Union[str, np.ndarray]]
+
+
+def mph_threshold(mps: float) -> float:
+    # Smallest mph value whose converted speed reaches mps, so comparing in mph
+    # classifies exactly like converting first.
+    mph = mps / MPH_TO_MPS
+    while mph * MPH_TO_MPS < mps:
+        mph = float(np.nextafter(mph, np.inf))
+    while float(np.nextafter(mph, -np.inf)) * MPH_TO_MPS >= mps:
+        mph = float(np.nextafter(mph, -np.inf))
+    return mph
+
+
+MPH_FAST_THRESHOLD = mph_threshold(MPS_FAST_THRESHOLD)
+MPH_MODERATE_THRESHOLD = mph_threshold(MPS_MODERATE_THRESHOLD)
 
 
 @dataclass
@@ -24,6 +89,17 @@ class CaptureStats:
     time_bucket: int
 
 
+@dataclass
+class LocationColumns:
+    stamps: List[str]
+    group: np.ndarray
+    lat: np.ndarray
+    lng: np.ndarray
+    timestamp: np.ndarray
+    speed_mph: np.ndarray
+    speed_set: np.ndarray
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Run the local Wayy ML pipeline on export bundles."
@@ -44,9 +120,15 @@ def parse_args() -> argparse.Namespace:
         help="YOLO model path (.pt)."
     )
     parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--batch", type=int, default=32)
     parser.add_argument("--confidence", type=float, default=0.25)
     parser.add_argument("--frame-rate", type=float, default=2.0)
     parser.add_argument("--device", default="cpu")
+    parser.add_argument(
+        "--keep-frames",
+        action="store_true",
+        help="Extract JPEG frames with ffmpeg even when torchcodec is installed."
+    )
     parser.add_argument("--watch", action="store_true")
     parser.add_argument("--interval", type=int, default=30)
     parser.add_argument("--max-exports", type=int, default=0)
@@ -68,20 +150,24 @@ def list_sources(input_dir: Path) -> List[Path]:
 def load_state(output_dir: Path) -> Dict[str, object]:
     state_path = output_dir / STATE_FILE
     if state_path.exists():
-        return json.loads(state_path.read_text())
+        return _loads(state_path.read_bytes())
     return {"processed": []}
 
 
 def save_state(output_dir: Path, state: Dict[str, object]) -> None:
     state_path = output_dir / STATE_FILE
-    state_path.write_text(json.dumps(state, indent=2))
+    # Write beside the real file and swap it in, so a crash never leaves a partial state.
+    temp_path = state_path.with_name(f"{STATE_FILE}.tmp")
+    temp_path.write_bytes(_dumps(state))
+    os.replace(temp_path, state_path)
 
 
 def prepare_export(
     script_path: Path,
     source: Path,
     run_dir: Path,
-    frame_rate: float
+    frame_rate: float,
+    extract_frames: bool = True
 ) -> None:
     run_dir.mkdir(parents=True, exist_ok=True)
     command = [
@@ -91,11 +177,10 @@ def prepare_export(
         str(source),
         "--output",
         str(run_dir),
-        "--copy-media",
-        "--extract-frames",
-        "--frame-rate",
-        str(frame_rate)
+        "--copy-media"
     ]
+    if extract_frames:
+        command.extend(["--extract-frames", "--frame-rate", str(frame_rate)])
     subprocess.run(command, check=True)
 
 
@@ -103,42 +188,75 @@ def parse_locations(locations_path: Path) -> List[Dict[str, object]]:
     records: List[Dict[str, object]] = []
     if not locations_path.exists():
         return records
-    with locations_path.open("r", encoding="utf-8") as handle:
+    with locations_path.open("rb") as handle:
         for line in handle:
-            line = line.strip()
-            if not line:
-                continue
+            # Blank lines fail to parse and are skipped like malformed ones.
             try:
-                record = json.loads(line)
+                record = _loads(line)
             except json.JSONDecodeError:
                 continue
             records.append(record)
     return records
 
 
-def build_capture_stats(records: Iterable[Dict[str, object]]) -> Dict[str, CaptureStats]:
-    grouped: Dict[str, List[Dict[str, object]]] = defaultdict(list)
-    for record in records:
-        stamp = record.get("captureStamp")
-        if not stamp:
-            continue
-        grouped[str(stamp)].append(record)
+def location_columns(records: Iterable[Dict[str, object]]) -> LocationColumns:
+    stamped = [record for record in records if record.get("captureStamp")]
+    # Groups are numbered in order of first appearance, matching dict insertion order.
+    groups: Dict[str, int] = {}
+    group = np.fromiter(
+        (groups.setdefault(str(record["captureStamp"]), len(groups)) for record in stamped),
+        dtype=np.intp,
+        count=len(stamped)
+    )
+
+    def column(key: str) -> np.ndarray:
+        # Non-numeric values become None, which NumPy stores as NaN.
+        values = (record.get(key) for record in stamped)
+        return np.array(
+            [value if value.__class__ in NUMBER_TYPES else None for value in values],
+            dtype=float
+        )
+
+    return LocationColumns(
+        stamps=list(groups),
+        group=group,
+        lat=column("lat"),
+        lng=column("lng"),
+        timestamp=column("timestamp"),
+        speed_mph=column("speedMph"),
+        speed_set=np.array([bool(record.get("speedMph")) for record in stamped], dtype=bool)
+    )
+
+
+def build_capture_stats(columns: LocationColumns) -> Dict[str, CaptureStats]:
+    group_count = len(columns.stamps)
+
+    def group_sums(values: np.ndarray, integral: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        valid = ~np.isnan(values)
+        groups = columns.group[valid]
+        counts = np.bincount(groups, minlength=group_count)
+        if integral and np.array_equal(values[valid], np.trunc(values[valid])):
+            # Millisecond timestamps lose precision in a float sum; add them as integers.
+            sums = np.zeros(group_count, dtype=np.int64)
+            np.add.at(sums, groups, values[valid].astype(np.int64))
+        else:
+            sums = np.bincount(groups, weights=values[valid], minlength=group_count)
+        return sums, counts
+
+    lat_sums, lat_counts = group_sums(columns.lat)
+    lng_sums, lng_counts = group_sums(columns.lng)
+    ts_sums, ts_counts = group_sums(columns.timestamp, integral=True)
+
     stats: Dict[str, CaptureStats] = {}
-    for stamp, items in grouped.items():
-        lats = [r.get("lat") for r in items if isinstance(r.get("lat"), (int, float))]
-        lngs = [r.get("lng") for r in items if isinstance(r.get("lng"), (int, float))]
-        timestamps = [r.get("timestamp") for r in items if isinstance(r.get("timestamp"), (int, float))]
-        if not lats or not lngs or not timestamps:
+    for index, stamp in enumerate(columns.stamps):
+        if not lat_counts[index] or not lng_counts[index] or not ts_counts[index]:
             continue
-        avg_lat = sum(lats) / len(lats)
-        avg_lng = sum(lngs) / len(lngs)
-        avg_ts = int(sum(timestamps) / len(timestamps))
-        dt = datetime.fromtimestamp(avg_ts / 1000, tz=timezone.utc)
+        avg_ts = int(ts_sums[index].item() / int(ts_counts[index]))
         stats[stamp] = CaptureStats(
-            lat=avg_lat,
-            lng=avg_lng,
+            lat=float(lat_sums[index] / lat_counts[index]),
+            lng=float(lng_sums[index] / lng_counts[index]),
             timestamp_ms=avg_ts,
-            time_bucket=dt.hour
+            time_bucket=time_bucket(avg_ts)
         )
     return stats
 
@@ -146,68 +264,239 @@ def build_capture_stats(records: Iterable[Dict[str, object]]) -> Dict[str, Captu
 def time_bucket(timestamp_ms: Optional[float]) -> Optional[int]:
     if timestamp_ms is None:
         return None
-    dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
-    return dt.hour
+    # UTC hour of day straight from epoch milliseconds.
+    return int(timestamp_ms // MS_PER_HOUR) % 24
 
 
-def build_traffic_segments(records: Iterable[Dict[str, object]]) -> List[Dict[str, object]]:
-    grouped: Dict[str, List[Dict[str, object]]] = defaultdict(list)
-    for record in records:
-        stamp = record.get("captureStamp")
-        if not stamp:
-            continue
-        grouped[str(stamp)].append(record)
+def build_traffic_segments(columns: LocationColumns) -> List[Dict[str, object]]:
     features: List[Dict[str, object]] = []
-    for stamp, items in grouped.items():
-        items_sorted = sorted(
-            items,
-            key=lambda r: r.get("timestamp") or 0
-        )
-        for prev, current in zip(items_sorted, items_sorted[1:]):
-            lat1 = prev.get("lat")
-            lng1 = prev.get("lng")
-            lat2 = current.get("lat")
-            lng2 = current.get("lng")
-            if not all(isinstance(v, (int, float)) for v in [lat1, lng1, lat2, lng2]):
-                continue
-            speed_mph = current.get("speedMph") or prev.get("speedMph")
-            if not isinstance(speed_mph, (int, float)):
-                continue
-            speed_mps = float(speed_mph) * MPH_TO_MPS
-            if speed_mps >= MPS_FAST_THRESHOLD:
-                severity = "fast"
-            elif speed_mps >= MPS_MODERATE_THRESHOLD:
-                severity = "moderate"
-            else:
-                severity = "slow"
-            bucket = time_bucket(current.get("timestamp"))
-            feature = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "LineString",
-                    "coordinates": [
-                        [float(lng1), float(lat1)],
-                        [float(lng2), float(lat2)]
-                    ]
-                },
-                "properties": {
-                    "severity": severity,
-                    "averageSpeedMps": speed_mps,
-                    "timeBucket": bucket,
-                    "captureStamp": stamp
-                }
+    # One stable sort by (capture, timestamp); segments are adjacent rows of the same capture.
+    sort_key = np.nan_to_num(columns.timestamp, nan=0.0)
+    order = np.lexsort((sort_key, columns.group))
+    prev, current = order[:-1], order[1:]
+
+    speed_mph = np.where(
+        columns.speed_set[current],
+        columns.speed_mph[current],
+        columns.speed_mph[prev]
+    )
+    valid = (columns.group[prev] == columns.group[current]) & ~(
+        np.isnan(columns.lat[prev])
+        | np.isnan(columns.lng[prev])
+        | np.isnan(columns.lat[current])
+        | np.isnan(columns.lng[current])
+        | np.isnan(speed_mph)
+    )
+    prev, current, speed_mph = prev[valid], current[valid], speed_mph[valid]
+    severities = np.select(
+        [speed_mph >= MPH_FAST_THRESHOLD, speed_mph >= MPH_MODERATE_THRESHOLD],
+        ["fast", "moderate"],
+        "slow"
+    )
+
+    # Same arithmetic as time_bucket; rows without a timestamp get -1 and map to None.
+    hours = np.floor_divide(columns.timestamp[current], MS_PER_HOUR) % 24
+    buckets = np.nan_to_num(hours, nan=-1).astype(np.int64)
+
+    stamps = columns.stamps
+    for lng1, lat1, lng2, lat2, severity, speed, bucket, group in zip(
+        columns.lng[prev].tolist(),
+        columns.lat[prev].tolist(),
+        columns.lng[current].tolist(),
+        columns.lat[current].tolist(),
+        severities.tolist(),
+        (speed_mph * MPH_TO_MPS).tolist(),
+        buckets.tolist(),
+        columns.group[current].tolist()
+    ):
+        feature = {
+            "type": "Feature",
+            "geometry": {
+                "type": "LineString",
+                "coordinates": [
+                    [lng1, lat1],
+                    [lng2, lat2]
+                ]
+            },
+            "properties": {
+                "severity": severity,
+                "averageSpeedMps": speed,
+                "timeBucket": bucket if bucket >= 0 else None,
+                "captureStamp": stamps[group]
             }
-            features.append(feature)
+        }
+        features.append(feature)
     return features
 
 
+def iter_images(root: str) -> Iterator[str]:
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_images(entry.path)
+            elif os.path.splitext(entry.name)[1].lower() in IMAGE_SUFFIXES:
+                yield entry.path
+
+
+def frame_hash(image: Union[str, np.ndarray]) -> str:
+    if isinstance(image, np.ndarray):
+        # Hash the frame's own buffer; only non-contiguous views get copied.
+        return _frame_hasher(np.ascontiguousarray(image)).hexdigest()
+    with open(image, "rb") as handle:
+        return _frame_hasher(handle.read()).hexdigest()
+
+
+def iter_frame_files(frames_root: Path) -> Iterator[FrameSource]:
+    if not frames_root.exists():
+        return
+    # Absolute, plainly sorted paths: the form and order predict() uses for list sources.
+    for image in sorted(iter_images(str(frames_root.absolute()))):
+        image_path = Path(image)
+        yield image_path.parent.name, image_path.name, image
+
+
+def decoder_device(device: str) -> str:
+    # YOLO takes GPU indices like "0" or "0,1"; the decoder wants a single torch device.
+    first = device.split(",")[0].strip()
+    if first.isdigit():
+        return f"cuda:{first}"
+    return first if first.startswith("cuda") else "cpu"
+
+
+def video_duration(metadata: object) -> Optional[float]:
+    # Container duration first, then the stream's own timing.
+    duration = getattr(metadata, "duration_seconds", None)
+    if duration:
+        return duration
+    end = getattr(metadata, "end_stream_seconds", None)
+    if end:
+        return end
+    num_frames = getattr(metadata, "num_frames", None)
+    average_fps = getattr(metadata, "average_fps", None)
+    if num_frames and average_fps:
+        return num_frames / average_fps
+    return None
+
+
+def iter_video_frames(
+    captures_dir: Path,
+    frame_rate: float,
+    device: str,
+    chunk_size: int
+) -> Iterator[FrameSource]:
+    if not captures_dir.exists():
+        return
+    for video in sorted(captures_dir.glob(f"{VIDEO_PREFIX}*.mp4")):
+        stamp = video.stem[len(VIDEO_PREFIX):]
+        decoder = VideoDecoder(str(video), device=device)
+        duration = video_duration(decoder.metadata)
+        if duration is None:
+            print(f"Skipping {video.name}: no duration in video metadata; rerun with --keep-frames")
+            continue
+        # Same sampling and 1-based naming as ffmpeg's fps filter writing frame_%06d.jpg.
+        seconds = np.arange(0.0, duration, 1.0 / frame_rate)
+        for start in range(0, len(seconds), chunk_size):
+            batch = decoder.get_frames_played_at(seconds[start:start + chunk_size].tolist())
+            # NCHW RGB tensors -> NHWC BGR arrays, which predict() letterboxes like images.
+            frames = batch.data.flip(1).permute(0, 2, 3, 1).contiguous().cpu().numpy()
+            for offset, frame in enumerate(frames):
+                yield stamp, f"frame_{start + offset + 1:06d}.jpg", frame
+
+
+def detection_cache_path(
+    output_dir: Path,
+    model_path: Path,
+    imgsz: int,
+    confidence: float,
+    device: str
+) -> Path:
+    # Cached boxes are only valid for the model file and settings that produced them.
+    model_stat = model_path.stat() if model_path.exists() else None
+    settings = json.dumps(
+        [
+            str(model_path.resolve()),
+            model_stat.st_size if model_stat else None,
+            model_stat.st_mtime_ns if model_stat else None,
+            imgsz,
+            confidence,
+            device
+        ]
+    )
+    digest = hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+    return output_dir / f"detections_cache_{digest}.jsonl"
+
+
+def load_detection_cache(cache_path: Path) -> Dict[str, List[List[object]]]:
+    cache: Dict[str, List[List[object]]] = {}
+    if not cache_path.exists():
+        return cache
+    line_count = 0
+    with cache_path.open("rb") as handle:
+        for line in handle:
+            line_count += 1
+            try:
+                entry = _loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(entry, dict):
+                continue
+            key = entry.get("hash")
+            boxes = entry.get("boxes")
+            if not isinstance(key, str) or not isinstance(boxes, list):
+                continue
+            if not all(isinstance(box, list) and len(box) == 2 for box in boxes):
+                continue
+            # Re-inserting moves the key to the end, so dict order follows write order.
+            cache.pop(key, None)
+            cache[key] = boxes
+    if len(cache) > DETECTION_CACHE_LIMIT:
+        for key in list(islice(cache, len(cache) - DETECTION_CACHE_LIMIT)):
+            del cache[key]
+    # Duplicate, malformed or evicted lines: rewrite the file with just the live entries.
+    if line_count != len(cache):
+        write_detection_cache(cache_path, cache)
+    return cache
+
+
+def write_detection_cache(cache_path: Path, cache: Dict[str, List[List[object]]]) -> None:
+    temp_path = cache_path.with_name(f"{cache_path.name}.tmp")
+    with temp_path.open("wb", buffering=1 << 20) as handle:
+        handle.writelines(_dumps_line({"hash": key, "boxes": boxes}) for key, boxes in cache.items())
+    os.replace(temp_path, cache_path)
+
+
+def iter_in_background(items: Iterable[object], maxsize: int = RESULT_QUEUE_SIZE) -> Iterator[object]:
+    # Drain items on a worker thread so the producer keeps running while the caller works.
+    pending: "queue.Queue[Tuple[bool, object]]" = queue.Queue(maxsize=maxsize)
+    done = object()
+
+    def produce() -> None:
+        try:
+            for item in items:
+                pending.put((True, item))
+            pending.put((True, done))
+        except BaseException as exc:
+            pending.put((False, exc))
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        ok, item = pending.get()
+        if not ok:
+            raise item
+        if item is done:
+            return
+        yield item
+
+
 def run_inference(
     model_path: Path,
-    frames_root: Path,
+    frames: Iterable[FrameSource],
     capture_stats: Dict[str, CaptureStats],
     imgsz: int,
     confidence: float,
-    device: str
+    device: str,
+    batch: int = 32,
+    cache_path: Optional[Path] = None
 ) -> List[Dict[str, object]]:
     try:
         from ultralytics import YOLO
@@ -215,109 +504,213 @@ def run_inference(
         print("Ultralytics not installed. Run: pip install ultralytics")
         sys.exit(1)
 
-    model = YOLO(str(model_path))
     detections: List[Dict[str, object]] = []
-    if not frames_root.exists():
-        return detections
-    images = sorted(
-        [p for p in frames_root.rglob("*") if p.suffix.lower() in {".jpg", ".jpeg", ".png"}]
-    )
-    if not images:
-        return detections
-    results = model.predict(
-        source=[str(p) for p in images],
-        imgsz=imgsz,
-        conf=confidence,
-        device=device,
-        stream=True
-    )
-    for result in results:
-        image_path = Path(result.path)
-        stamp = image_path.parent.name
-        stats = capture_stats.get(stamp)
-        if stats is None:
-            continue
-        for box in result.boxes:
-            class_id = int(box.cls[0]) if box.cls is not None else None
-            if class_id is None:
-                continue
-            class_name = result.names.get(class_id, str(class_id))
-            conf = float(box.conf[0]) if box.conf is not None else None
-            detections.append(
-                {
-                    "captureStamp": stamp,
-                    "frame": image_path.name,
-                    "class": class_name,
-                    "confidence": conf,
-                    "lat": stats.lat,
-                    "lng": stats.lng,
-                    "timestamp": stats.timestamp_ms,
-                    "timeBucket": stats.time_bucket
-                }
+    # Boxes per frame content hash, as [class name, confidence] pairs.
+    cache = load_detection_cache(cache_path) if cache_path is not None else {}
+    model = None
+    frame_iter = iter(frames)
+    batch = max(1, batch)
+    while True:
+        chunk = list(islice(frame_iter, batch))
+        if not chunk:
+            break
+        # Paths are cheap to hold, so file sources run a few batches per predict() call;
+        # decoded frames stay at one batch to bound memory.
+        if not isinstance(chunk[0][2], np.ndarray):
+            chunk.extend(islice(frame_iter, batch * (INFERENCE_CHUNK_BATCHES - 1)))
+        keys = [frame_hash(image) for _, _, image in chunk]
+        pending = [index for index, key in enumerate(keys) if key not in cache]
+        if pending:
+            if model is None:
+                model = YOLO(str(model_path))
+            results = model.predict(
+                source=[chunk[index][2] for index in pending],
+                imgsz=imgsz,
+                conf=confidence,
+                device=device,
+                stream=True,
+                batch=batch,
+                half=device != "cpu"
             )
+            new_entries: List[Dict[str, object]] = []
+            received = 0
+            # Results arrive in source order; decode boxes here while the next batch runs.
+            for result in iter_in_background(results):
+                if received >= len(pending):
+                    received += 1
+                    continue
+                index = pending[received]
+                received += 1
+                boxes: List[List[object]] = []
+                for box in result.boxes:
+                    class_id = int(box.cls[0]) if box.cls is not None else None
+                    if class_id is None:
+                        continue
+                    class_name = result.names.get(class_id, str(class_id))
+                    conf = float(box.conf[0]) if box.conf is not None else None
+                    boxes.append([class_name, conf])
+                cache[keys[index]] = boxes
+                new_entries.append({"hash": keys[index], "boxes": boxes})
+            if cache_path is not None and new_entries:
+                with cache_path.open("ab") as handle:
+                    handle.writelines(_dumps_line(entry) for entry in new_entries)
+            if received != len(pending):
+                raise RuntimeError(
+                    f"YOLO returned {received} results for {len(pending)} frames"
+                )
+
+        for (stamp, frame_name, _), key in zip(chunk, keys):
+            stats = capture_stats.get(stamp)
+            if stats is None:
+                continue
+            for class_name, conf in cache[key]:
+                detections.append(
+                    {
+                        "captureStamp": stamp,
+                        "frame": frame_name,
+                        "class": class_name,
+                        "confidence": conf,
+                        "lat": stats.lat,
+                        "lng": stats.lng,
+                        "timestamp": stats.timestamp_ms,
+                        "timeBucket": stats.time_bucket
+                    }
+                )
     return detections
 
 
 def write_jsonl(path: Path, records: Iterable[Dict[str, object]]) -> None:
-    with path.open("w", encoding="utf-8") as handle:
-        for record in records:
-            handle.write(json.dumps(record) + "\n")
+    with path.open("wb", buffering=1 << 20) as handle:
+        handle.writelines(_dumps_line(record) for record in records)
 
 
 def write_geojson(path: Path, features: List[Dict[str, object]]) -> None:
-    payload = {"type": "FeatureCollection", "features": features}
-    path.write_text(json.dumps(payload, indent=2))
+    # Stream one feature at a time instead of serializing the whole collection in memory.
+    with path.open("wb", buffering=1 << 20) as handle:
+        handle.write(b'{"type":"FeatureCollection","features":[')
+        for index, feature in enumerate(features):
+            if index:
+                handle.write(b",")
+            handle.write(_dumps(feature))
+        handle.write(b"]}")
+
+
+def coordinate_bins(values: np.ndarray) -> np.ndarray:
+    scaled = values * 1e4
+    bins = np.rint(scaled)
+    # The scaled product is itself rounded, so values within float error of a .5 boundary
+    # are re-binned with round() to keep round(value, 4) semantics.
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for index in np.flatnonzero(near_half):
+        bins[index] = round(round(float(values[index]), 4) * 1e4)
+    return bins.astype(np.int64)
+
+
+def group_detections(
+    keys: np.ndarray,
+    confidence: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # lexsort is stable, so the first row of each run of equal keys is its first occurrence.
+    order = np.lexsort(keys.T[::-1])
+    sorted_keys = keys[order]
+    starts = np.ones(len(keys), dtype=bool)
+    starts[1:] = np.any(sorted_keys[1:] != sorted_keys[:-1], axis=1)
+    inverse = np.empty(len(keys), dtype=np.intp)
+    inverse[order] = np.cumsum(starts) - 1
+    first_index = order[starts]
+    # Number groups in order of first appearance, matching dict insertion order.
+    appearance = np.argsort(first_index, kind="stable")
+    rank = np.empty(len(first_index), dtype=np.intp)
+    rank[appearance] = np.arange(len(first_index))
+    group = rank[inverse]
+    counts = np.bincount(group, minlength=len(first_index))
+    conf_totals = np.bincount(
+        group, weights=np.nan_to_num(confidence, nan=0.0), minlength=len(first_index)
+    )
+    return first_index[appearance], counts, conf_totals
+
+
+if nb is not None:
+    DETECTION_KEY_TYPE = nb.types.UniTuple(nb.types.int64, 4)
+
+    @nb.njit(cache=True)
+    def group_detections_jit(
+        keys: np.ndarray,
+        confidence: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n = keys.shape[0]
+        groups = nb.typed.Dict.empty(key_type=DETECTION_KEY_TYPE, value_type=nb.types.int64)
+        first_index = np.empty(n, dtype=np.int64)
+        counts = np.zeros(n, dtype=np.int64)
+        conf_totals = np.zeros(n, dtype=np.float64)
+        for i in range(n):
+            key = (keys[i, 0], keys[i, 1], keys[i, 2], keys[i, 3])
+            if key in groups:
+                group = groups[key]
+            else:
+                group = len(groups)
+                groups[key] = group
+                first_index[group] = i
+            counts[group] += 1
+            if not np.isnan(confidence[i]):
+                conf_totals[group] += confidence[i]
+        size = len(groups)
+        return first_index[:size], counts[:size], conf_totals[:size]
 
 
 def aggregate_road_conditions(detections: Iterable[Dict[str, object]]) -> List[Dict[str, object]]:
-    buckets: Dict[Tuple[str, float, float, int], Dict[str, object]] = {}
+    labels: Dict[str, int] = {}
+    label_ids: List[int] = []
+    lats: List[float] = []
+    lngs: List[float] = []
+    time_buckets: List[int] = []
+    confidences: List[Optional[float]] = []
     for record in detections:
         lat = record.get("lat")
         lng = record.get("lng")
         time_bucket_value = record.get("timeBucket")
         label = record.get("class")
-        if not isinstance(lat, (int, float)) or not isinstance(lng, (int, float)):
+        if lat.__class__ not in NUMBER_TYPES or lng.__class__ not in NUMBER_TYPES:
             continue
         if not isinstance(time_bucket_value, int) or label is None:
             continue
-        key = (
-            str(label),
-            round(float(lat), 4),
-            round(float(lng), 4),
-            time_bucket_value
-        )
-        bucket = buckets.setdefault(
-            key,
-            {
-                "label": str(label),
-                "lat": round(float(lat), 4),
-                "lng": round(float(lng), 4),
-                "timeBucket": time_bucket_value,
-                "count": 0,
-                "confTotal": 0.0
-            }
-        )
-        bucket["count"] += 1
         conf = record.get("confidence")
-        if isinstance(conf, (int, float)):
-            bucket["confTotal"] += float(conf)
+        label_ids.append(labels.setdefault(str(label), len(labels)))
+        lats.append(lat)
+        lngs.append(lng)
+        time_buckets.append(time_bucket_value)
+        confidences.append(conf if conf.__class__ in NUMBER_TYPES else None)
 
     features: List[Dict[str, object]] = []
-    for bucket in buckets.values():
-        count = bucket["count"]
-        avg_conf = bucket["confTotal"] / count if count else None
+    if not label_ids:
+        return features
+    lat_bins = coordinate_bins(np.array(lats, dtype=float))
+    lng_bins = coordinate_bins(np.array(lngs, dtype=float))
+    keys = np.stack(
+        [np.array(label_ids, dtype=np.int64), lat_bins, lng_bins, np.array(time_buckets, dtype=np.int64)],
+        axis=1
+    )
+    confidence = np.array(confidences, dtype=float)
+    if nb is not None:
+        first_index, counts, conf_totals = group_detections_jit(keys, confidence)
+    else:
+        first_index, counts, conf_totals = group_detections(keys, confidence)
+
+    label_names = list(labels)
+    for row, count, conf_total in zip(first_index.tolist(), counts.tolist(), conf_totals.tolist()):
+        label_id, lat_bin, lng_bin, time_bucket_value = keys[row].tolist()
         features.append(
             {
                 "type": "Feature",
                 "geometry": {
                     "type": "Point",
-                    "coordinates": [bucket["lng"], bucket["lat"]]
+                    "coordinates": [lng_bin / 1e4, lat_bin / 1e4]
                 },
                 "properties": {
-                    "label": bucket["label"],
+                    "label": label_names[label_id],
                     "count": count,
-                    "avgConfidence": avg_conf,
-                    "timeBucket": bucket["timeBucket"]
+                    "avgConfidence": conf_total / count if count else None,
+                    "timeBucket": time_bucket_value
                 }
             }
         )
@@ -342,30 +735,50 @@ def summarize(
     }
 
 
+def link_artifact(artifact: Path, target: Path) -> None:
+    target.unlink(missing_ok=True)
+    try:
+        os.link(artifact, target)
+    except OSError:
+        shutil.copyfile(artifact, target)
+
+
 def process_source(
     source: Path,
     run_dir: Path,
     script_path: Path,
     args: argparse.Namespace
 ) -> None:
-    prepare_export(script_path, source, run_dir, args.frame_rate)
+    # With torchcodec, frames are decoded straight from the copied videos instead of JPEGs.
+    decode_videos = VideoDecoder is not None and not args.keep_frames
+    prepare_export(script_path, source, run_dir, args.frame_rate, extract_frames=not decode_videos)
     locations_path = run_dir / "wayy_locations.jsonl"
-    records = parse_locations(locations_path)
-    capture_stats = build_capture_stats(records)
+    columns = location_columns(parse_locations(locations_path))
+    capture_stats = build_capture_stats(columns)
+    if decode_videos:
+        frames = iter_video_frames(
+            run_dir / "captures", args.frame_rate, decoder_device(args.device), args.batch
+        )
+    else:
+        frames = iter_frame_files(run_dir / "frames")
     detections = run_inference(
         model_path=Path(args.model),
-        frames_root=run_dir / "frames",
+        frames=frames,
         capture_stats=capture_stats,
         imgsz=args.imgsz,
         confidence=args.confidence,
-        device=args.device
+        device=args.device,
+        batch=args.batch,
+        cache_path=detection_cache_path(
+            run_dir.parent, Path(args.model), args.imgsz, args.confidence, args.device
+        )
     )
     detections_path = run_dir / "detections.jsonl"
     write_jsonl(detections_path, detections)
     road_features = aggregate_road_conditions(detections)
     road_path = run_dir / "road_conditions.geojson"
     write_geojson(road_path, road_features)
-    traffic_features = build_traffic_segments(records)
+    traffic_features = build_traffic_segments(columns)
     traffic_path = run_dir / "traffic_segments.geojson"
     write_geojson(traffic_path, traffic_features)
     summary_path = run_dir / "summary.json"
@@ -374,8 +787,7 @@ def process_source(
     latest_dir = run_dir.parent / "latest"
     latest_dir.mkdir(parents=True, exist_ok=True)
     for artifact in [detections_path, road_path, traffic_path, summary_path]:
-        target = latest_dir / artifact.name
-        target.write_text(artifact.read_text())
+        link_artifact(artifact, latest_dir / artifact.name)
 
 
 def run_once(args: argparse.Namespace) -> int:
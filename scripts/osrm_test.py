@@ -2,16 +2,46 @@
 """
 Simple OSRM test script to request a route and print a brief summary.
 """
+import asyncio
 import json
 import urllib.request
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Keep batches polite towards the public demo server.
+MAX_CONNECTIONS = 4
+
+def route_url(start_lon, start_lat, end_lon, end_lat):
+    return f"https://router.project-osrm.org/route/v1/driving/{start_lon},{start_lat};{end_lon},{end_lat}?overview=full&geometries=geojson"
+
 def fetch_route(start_lon, start_lat, end_lon, end_lat):
-    url = f"https://router.project-osrm.org/route/v1/driving/{start_lon},{start_lat};{end_lon},{end_lat}?overview=full&geometries=geojson"
+    url = route_url(start_lon, start_lat, end_lon, end_lat)
     print(f"Requesting: {url}")
     with urllib.request.urlopen(url, timeout=15) as r:
         data = json.load(r)
     return data
 
+async def _fetch_routes_async(urls):
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    timeout = aiohttp.ClientTimeout(total=15)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def fetch(url):
+            print(f"Requesting: {url}")
+            async with session.get(url) as r:
+                r.raise_for_status()
+                return await r.json()
+        return await asyncio.gather(*(fetch(url) for url in urls))
+
+def fetch_routes(coordinates):
+    """Fetch routes for (start_lon, start_lat, end_lon, end_lat) tuples, in order."""
+    if aiohttp is None:
+        return [fetch_route(*coords) for coords in coordinates]
+    # One session keeps connections alive across requests instead of a handshake per route.
+    return asyncio.run(_fetch_routes_async([route_url(*coords) for coords in coordinates]))
+
 def summarize(data):
     routes = data.get('routes', [])
     if not routes:
@@ -23,9 +53,13 @@ def summarize(data):
     coords = r.get('geometry', {}).get('coordinates', [])
     print(f"Distance: {distance} meters, Duration: {duration} seconds, Points: {len(coords)}")
 
+# San Francisco short samples as (start_lon, start_lat, end_lon, end_lat)
+SAMPLE_ROUTES = [
+    (-122.4194, 37.7749, -122.4094, 37.7849),
+    (-122.4194, 37.7749, -122.4313, 37.7739),
+    (-122.4094, 37.7849, -122.3937, 37.7955),
+]
+
 if __name__ == '__main__':
-    # San Francisco short sample
-    start_lon, start_lat = -122.4194, 37.7749
-    end_lon, end_lat = -122.4094, 37.7849
-    data = fetch_route(start_lon, start_lat, end_lon, end_lat)
-    summarize(data)
+    for data in fetch_routes(SAMPLE_ROUTES):
+        summarize(data)